@@ -0,0 +1,246 @@
+# fcp_analysis.py
+
+import json
+import os
+import time
+import numpy as np
+from fcp_audio_io import load_wav_mono, wav_info
+from fcp_ltas import compute_fcp_batch, compute_fcp_praat_style, compute_ltas_over_intervals, rate_level_offset
+from fcp_results import WindowResults
+from fcp_stream import analyze_wav_streaming
+from fcp_voiced_ltas import get_pitch_track, get_voiced_mask, iter_sliding_ltas_voiced, voiced_segments
+
+# With streaming=None, files at least this long are analysed out-of-core
+STREAMING_MIN_SECS = 600
+# The global FCP needs at least this much voiced audio
+MIN_VOICED_SECS = 0.2
+# Voiced windows whose metrics are computed together (compute_fcp_batch) before entering `rows`
+FCP_BATCH = 64
+# Per-window columns of the batch/CLI window rows
+BATCH_WINDOW_FIELDS = [
+    "filename", "window_start_sec", "window_end_sec",
+    "Lmax_0_2", "Lmax_2_5", "Lmax_5_8", "Lmax_2_4", "FCP",
+    "Delta_0_2_2_5", "Delta_2_5_5_8", "Delta_0_2_5_8", "Delta_2_4"
+]
+GLOBAL_KEYS = ("Lmax_0_2", "Lmax_2_5", "Lmax_5_8", "Lmax_2_4", "FCP", "Trend_at_FCP_Peak")
+
+class FileAnalysis:
+    """
+    One analysis of one WAV file, shared by LOAD (fcp_file_loader) and
+    BATCH / the command line (fcp_batch): sliding-window rows, global voiced
+    LTAS/FCP and summary stats, all from a single decode and pitch track.
+
+    The pitch track gives both the per-sample voicing (which 40 ms frames
+    enter the windows, each frame spectrum computed once and shared by every
+    window that overlaps it) and the voiced segments (the global LTAS, framed
+    in place over the segment intervals). Window metrics go into `rows`
+    (a WindowResults, LTAS included); the summary stats are read from it.
+
+    streaming: True runs the region-by-region pass of fcp_stream (bounded
+               memory, first rows early); None does so for files
+               >= STREAMING_MIN_SECS. Ignored with per_window_pitch.
+    dtype: np.float32 decodes the file and computes the frame spectra in single
+           precision (half the memory traffic; LTAS sums stay float64).
+    rows: optional WindowResults to append to (e.g. the GUI's buffer).
+    With fs_target=None (native rate) all LTAS levels are shifted by
+    fcp_ltas.rate_level_offset, so Lmax values compare with 44.1 kHz runs;
+    at a given fs_target they are exactly those of fcp_reference.
+    After run(): rows, freqs_full/ltas_full (None below MIN_VOICED_SECS of
+    voiced audio), global_metrics (GLOBAL_KEYS), voiced_samples, n_samples,
+    fs and first_window ((freqs, ltas) of the window starting at 0).
+    """
+
+    def __init__(self, path, fs_target=44100, window_secs=1.0, step_secs=0.1, bandwidth=350,
+                 per_window_pitch=False, streaming=None, dtype=np.float64, rows=None):
+        self.path = path
+        self.filename = os.path.basename(path)
+        self.fs_target = fs_target
+        self.window_secs = window_secs
+        self.step_secs = step_secs
+        self.bandwidth = bandwidth
+        self.per_window_pitch = per_window_pitch
+        self.streaming = streaming
+        self.dtype = np.dtype(dtype)
+        self.rows = rows if rows is not None else WindowResults(self.filename)
+        self.fs = None
+        self.n_samples = 0
+        self.analysed_secs = 0.0  # windows ending before this time are all in `rows`
+        self.first_window = None
+        self.voiced_samples = 0
+        self.freqs_full = self.ltas_full = None
+        self.global_metrics = (np.nan,) * len(GLOBAL_KEYS)
+        self.from_cache = False
+
+    @property
+    def global_fcp(self):
+        return self.global_metrics[4]
+
+    def run(self, data=None, fs=None, cache=None, on_window=None, flush_interval=None):
+        """
+        Analyse the file. data, fs: the file already decoded at fs_target
+        (saves a second decode, also when streaming).
+        cache: optional fcp_cache.AnalysisCache; results of an earlier run with
+               the same audio and parameters are restored instead.
+        on_window(analysis): called after each sliding window, in time order.
+        flush_interval: with on_window, pending windows also enter `rows` once
+                        this many seconds have passed since the last flush (so
+                        progress displays are not held back until FCP_BATCH).
+        Returns self.
+        """
+        fs_in, n_in = wav_info(self.path)
+        fs = fs or (self.fs_target if self.fs_target is not None else fs_in)
+        self.fs = fs
+        if self.per_window_pitch:
+            streaming = False
+        elif self.streaming is None:
+            streaming = n_in / fs_in >= STREAMING_MIN_SECS
+        else:
+            streaming = bool(self.streaming)
+
+        key = None
+        if cache is not None:
+            key = cache.key(self.path, analysis="file", fs_target=self.fs_target,
+                            window_secs=self.window_secs, step_secs=self.step_secs, bandwidth=self.bandwidth,
+                            per_window_pitch=self.per_window_pitch, streaming=streaming,
+                            dtype=self.dtype.name)
+            cached = cache.load(key)
+            if cached is not None:
+                self._restore(cached)
+                return self
+
+        self._win_samples = int(self.window_secs * fs)
+        self._level_offset = rate_level_offset(fs) if self.fs_target is None else 0.0
+        self._on_window = on_window
+        self._pending = []  # voiced windows (start, freqs, ltas) not yet in rows
+        self._flush_interval = flush_interval if on_window is not None else None
+        self._last_flush = time.monotonic()
+        if streaming:
+            result = analyze_wav_streaming(self.path, self.fs_target, self.window_secs, self.step_secs,
+                                           self.bandwidth, on_window=self._add_window, dtype=self.dtype,
+                                           data=data)
+            self.n_samples = result["n_samples"]
+            self.voiced_samples = result["voiced_samples"]
+            freqs_full, ltas_full = result["freqs_full"], result["ltas_full"]
+        else:
+            if data is None:
+                data, fs = load_wav_mono(self.path, self.fs_target, cache=False, dtype=self.dtype)
+            self.n_samples = len(data)
+            pitch_track = get_pitch_track(data, fs)
+            # Global voiced LTAS straight from the voiced segments of data (no concatenated copy)
+            seg_starts, seg_ends = voiced_segments(pitch_track, fs)
+            self.voiced_samples = int(np.sum(np.minimum(seg_ends, self.n_samples) - seg_starts))
+            freqs_full, ltas_full = compute_ltas_over_intervals(data, fs, seg_starts, seg_ends,
+                                                                bandwidth=self.bandwidth)
+            # Sliding windows over the same track (None: pitch tracked inside every window)
+            voiced_mask = None if self.per_window_pitch else get_voiced_mask(data, fs, pitch_track)
+            for start, freqs, ltas in iter_sliding_ltas_voiced(data, fs, self._win_samples,
+                                                               int(self.step_secs * fs),
+                                                               bandwidth=self.bandwidth, mask=voiced_mask):
+                self._add_window(start, freqs, ltas)
+        self._flush_windows()
+        self.analysed_secs = self.n_samples / fs
+
+        # ------ Global FCP: calculated on all voiced segments taken together ------
+        if self.voiced_samples >= int(MIN_VOICED_SECS * fs):
+            self.freqs_full, self.ltas_full = freqs_full, ltas_full + self._level_offset
+            self.global_metrics = compute_fcp_praat_style(self.freqs_full, self.ltas_full)
+
+        if key is not None:
+            cache.save(key, self._cache_arrays())
+        return self
+
+    def _add_window(self, start, freqs, ltas):
+        if self._level_offset:
+            ltas = ltas + self._level_offset
+        if start == 0:
+            self.first_window = (freqs, ltas)
+        self._window_end = (start + self._win_samples) / self.fs
+        if len(ltas) >= 1 and not np.isnan(ltas).all():  # skip windows without enough voiced audio
+            self._pending.append((start, freqs, ltas))
+            if len(self._pending) >= FCP_BATCH or (
+                    self._flush_interval is not None
+                    and time.monotonic() - self._last_flush >= self._flush_interval):
+                self._flush_windows()
+        elif not self._pending:
+            self.analysed_secs = self._window_end
+        if self._on_window is not None:
+            self._on_window(self)
+
+    def _flush_windows(self):
+        # Metrics of the pending windows in one batch, then one row each
+        if self._pending:
+            fs = self.fs
+            freqs = self._pending[0][1]
+            metrics = compute_fcp_batch(freqs, np.stack([ltas for _, _, ltas in self._pending]))
+            for (start, freqs, ltas), values in zip(self._pending, zip(*metrics)):
+                Lmax_0_2, Lmax_2_5, Lmax_5_8, Lmax_2_4, fcp, trend_at_fcp_peak = values
+                self.rows.append({
+                    "filename": self.filename,
+                    "window_start_sec": start / fs,
+                    "window_end_sec": (start + self._win_samples) / fs,
+                    "Lmax_0_2": Lmax_0_2,
+                    "Lmax_2_5": Lmax_2_5,
+                    "Lmax_5_8": Lmax_5_8,
+                    "Lmax_2_4": Lmax_2_4,
+                    "FCP": fcp,
+                    "Trend_at_FCP_Peak": trend_at_fcp_peak,
+                    "Delta_0_2_2_5": Lmax_2_5 - Lmax_0_2,
+                    "Delta_2_5_5_8": Lmax_5_8 - Lmax_2_5,
+                    "Delta_0_2_5_8": Lmax_5_8 - Lmax_0_2,
+                    "Delta_2_4": Lmax_2_4,
+                    "freqs": freqs,
+                    "ltas": ltas
+                })
+            self._pending = []
+            self.analysed_secs = self._window_end
+        self._last_flush = time.monotonic()
+
+    # -------- Outputs --------
+    def summary_row(self):
+        """Per-file summary: duration, global metrics and window FCP stats."""
+        fcps = self.rows.column("FCP")
+        n = len(fcps)
+        row = {"filename": self.filename, "duration_sec": round(self.n_samples / self.fs, 3)}
+        for name, value in zip(GLOBAL_KEYS, self.global_metrics):
+            row["global_" + name] = value
+        row["windows_mean_FCP"] = float(np.nanmean(fcps)) if n else np.nan
+        row["windows_sd_FCP"] = float(np.nanstd(fcps, ddof=1)) if n > 1 else np.nan
+        row["windows_count"] = n
+        return row
+
+    def window_rows(self):
+        """Window rows as dicts with BATCH_WINDOW_FIELDS (no LTAS)."""
+        return list(self.rows.rows(BATCH_WINDOW_FIELDS))
+
+    # -------- Persistence (fcp_cache) --------
+    def _cache_arrays(self):
+        # File name excluded: the key is content-based
+        rows = self.rows
+        if not isinstance(rows, WindowResults):
+            rows = WindowResults()
+            for row in self.rows:
+                rows.append(row)
+        arrays = rows.to_arrays(prefix="rows_")
+        arrays["state_json"] = np.array(json.dumps({
+            "fs": self.fs, "n_samples": self.n_samples, "voiced_samples": self.voiced_samples,
+            "global_metrics": [float(v) for v in self.global_metrics]}))
+        if self.freqs_full is not None:
+            arrays["freqs_full"], arrays["ltas_full"] = self.freqs_full, self.ltas_full
+        if self.first_window is not None:
+            arrays["first_freqs"], arrays["first_ltas"] = self.first_window
+        return arrays
+
+    def _restore(self, arrays):
+        for row in WindowResults.from_arrays(arrays, prefix="rows_", filename=self.filename):
+            self.rows.append(row)
+        state = json.loads(str(arrays["state_json"]))
+        self.fs = state["fs"]
+        self.n_samples = state["n_samples"]
+        self.voiced_samples = state["voiced_samples"]
+        self.global_metrics = tuple(state["global_metrics"])
+        self.freqs_full = arrays.get("freqs_full")
+        self.ltas_full = arrays.get("ltas_full")
+        if "first_ltas" in arrays:
+            self.first_window = (arrays["first_freqs"], arrays["first_ltas"])
+        self.analysed_secs = self.n_samples / self.fs
+        self.from_cache = True
@@ -0,0 +1,169 @@
+# fcp_audio_io.py
+
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+import soundfile as sf
+from math import gcd
+from scipy.io import wavfile
+
+# Decoded/resampled audio of recently loaded files is kept in memory up to this
+# many bytes in total (least recently used files are dropped first)
+LOAD_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# Input samples per resampling block
+RESAMPLE_BLOCK = 1 << 20
+
+def load_wav_mono(path, fs_target=44100, cache=True, dtype=np.float64):
+    """
+    Read a WAV file, average channels to mono and resample to fs_target
+    (None keeps the file's own sample rate, skipping the resampling pass).
+    Returns (data, fs) with data as dtype (float64, or float32 for the
+    single-precision analysis path: half the memory, and playback-ready).
+    Resampling is rational-ratio polyphase, done block by block.
+    cache: reuse the result for an unchanged file (same path, size and mtime;
+           an edited file is decoded again); cached arrays are returned
+           read-only. The cache holds at most LOAD_CACHE_MAX_BYTES, see also
+           clear_load_cache.
+    """
+    dtype = np.dtype(dtype)
+    if not cache:
+        return _load_wav_mono(path, fs_target, dtype)
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_size, st.st_mtime_ns, fs_target, dtype)
+    with _load_cache_lock:
+        if key in _load_cache:
+            _load_cache.move_to_end(key)
+            return _load_cache[key]
+    data, fs = _load_wav_mono(path, fs_target, dtype)
+    data.setflags(write=False)
+    with _load_cache_lock:
+        _load_cache[key] = (data, fs)
+        # Drop the least recently used entries (and this one, if it alone is too big)
+        while _load_cache and sum(d.nbytes for d, _ in _load_cache.values()) > LOAD_CACHE_MAX_BYTES:
+            _load_cache.popitem(last=False)
+    return data, fs
+
+def clear_load_cache():
+    """Forget all audio kept by load_wav_mono(cache=True), e.g. when another file is loaded."""
+    with _load_cache_lock:
+        _load_cache.clear()
+
+def _load_wav_mono(path, fs_target, dtype=np.float64):
+    fs, data = wavfile.read(path)
+    if data.ndim > 1:
+        data = np.mean(data, axis=1)
+    if fs_target is not None and fs != fs_target:
+        data = resample_blocks(data, fs, fs_target)
+        fs = fs_target
+    return data.astype(dtype), fs
+
+_load_cache = OrderedDict()  # (path, size, mtime_ns, fs_target, dtype) -> (data, fs)
+_load_cache_lock = threading.Lock()
+
+def resample_blocks(x, fs_in, fs_out, block=RESAMPLE_BLOCK):
+    """
+    Polyphase resampling of x from fs_in to fs_out, fed through a
+    StreamingResampler in blocks. Returns int(len(x) * fs_out / fs_in) samples
+    (the length the FFT-based resample was called with before).
+    """
+    n_out = int(len(x) * fs_out / fs_in)
+    out = np.empty(n_out)
+    resampler = StreamingResampler(fs_out, fs_in)
+    pos = 0
+    for i in range(0, len(x), block):
+        y = resampler.process(x[i:i + block])[:n_out - pos]
+        out[pos:pos + len(y)] = y
+        pos += len(y)
+    y = resampler.flush()[:n_out - pos]
+    out[pos:pos + len(y)] = y
+    pos += len(y)
+    return out[:pos]
+
+class StreamingResampler:
+    """
+    Block-by-block rational resampler (up/down polyphase FIR).
+    Feeding a signal through process() in any block sizes and then calling
+    flush() gives exactly scipy.signal.resample_poly(x, up, down) of the
+    whole signal, while only keeping the last few input samples as state.
+    """
+
+    def __init__(self, up, down):
+        # scipy.signal is slow to import and only needed when a file is resampled
+        from scipy.signal import firwin, upfirdn
+        self._upfirdn = upfirdn
+        g = gcd(up, down)
+        self.up = up // g
+        self.down = down // g
+        max_rate = max(self.up, self.down)
+        half_len = 10 * max_rate
+        h = firwin(2 * half_len + 1, 1. / max_rate, window=('kaiser', 5.0)) * self.up
+        n_pre_pad = self.down - half_len % self.down
+        self.h = np.concatenate((np.zeros(n_pre_pad), h))
+        self.n_pre_remove = (half_len + n_pre_pad) // self.down
+        self._buf = np.zeros(0)  # input samples from self._base on
+        self._base = 0  # absolute input index of _buf[0] (multiple of down)
+        self._n_in = 0  # input samples received
+        self._n_done = 0  # output samples emitted
+
+    def _emit(self, n_in_avail):
+        # Outputs m are final once every input they depend on has arrived
+        m_hi = (n_in_avail * self.up - 1) // self.down - self.n_pre_remove
+        if m_hi < self._n_done or len(self._buf) == 0:
+            return np.zeros(0)
+        z = self._upfirdn(self.h, self._buf, self.up, self.down)
+        j0 = self._base * self.up // self.down
+        out = z[self._n_done + self.n_pre_remove - j0:m_hi + 1 + self.n_pre_remove - j0]
+        self._n_done = m_hi + 1
+        # Drop inputs no later output needs (keep _base a multiple of down)
+        n_min = -(-((self._n_done + self.n_pre_remove) * self.down - len(self.h) + 1) // self.up)
+        new_base = max(n_min, 0) // self.down * self.down
+        if new_base > self._base:
+            self._buf = self._buf[new_base - self._base:]
+            self._base = new_base
+        return out
+
+    def process(self, x):
+        """Feed input samples; returns the output samples that are now final."""
+        if self.up == self.down:
+            return np.asarray(x, dtype=np.float64)
+        self._buf = np.concatenate((self._buf, x))
+        self._n_in += len(x)
+        return self._emit(self._n_in)
+
+    def flush(self):
+        """Return the remaining output (the signal is zero beyond its end)."""
+        if self.up == self.down:
+            return np.zeros(0)
+        n_out = -(-self._n_in * self.up // self.down)
+        n_zeros = ((n_out - 1 + self.n_pre_remove) * self.down) // self.up + 1 - self._n_in
+        if n_zeros > 0:
+            self._buf = np.concatenate((self._buf, np.zeros(n_zeros)))
+        out = self._emit(self._n_in + max(n_zeros, 0))
+        return out[:max(n_out - (self._n_done - len(out)), 0)]
+
+# soundfile dtype that reproduces scipy.io.wavfile's sample values per subtype
+_WAVFILE_DTYPES = {
+    'PCM_16': 'int16', 'PCM_24': 'int32', 'PCM_32': 'int32',
+    'FLOAT': 'float32', 'DOUBLE': 'float64', 'PCM_U8': 'int16',
+}
+
+def wav_info(path):
+    """Return (sample_rate, n_frames) without reading the samples."""
+    info = sf.info(path)
+    return info.samplerate, info.frames
+
+def iter_wav_mono_blocks(path, block_frames):
+    """
+    Read a WAV file block by block (bounded memory) and yield mono blocks with
+    the same sample values as scipy.io.wavfile.read + channel averaging.
+    """
+    subtype = sf.info(path).subtype
+    dtype = _WAVFILE_DTYPES.get(subtype, 'float64')
+    for block in sf.blocks(path, blocksize=block_frames, dtype=dtype, always_2d=True):
+        if subtype == 'PCM_U8':
+            block = ((block >> 8) + 128).astype(np.uint8)
+        if block.shape[1] > 1:
+            yield np.mean(block, axis=1)
+        else:
+            yield block[:, 0]
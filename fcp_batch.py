@@ -0,0 +1,125 @@
+# fcp_batch.py
+
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from fcp_analysis import FileAnalysis
+from fcp_ltas import get_fcp_color
+
+def analyze_file(path, out_dir, fs_target=44100, window_secs=1.0, step_secs=0.1, bandwidth=350,
+                 per_window_pitch=False, streaming=None, cache=None, plots=True, dtype=np.float64):
+    """
+    Full batch analysis of one WAV file (global voiced FCP + sliding windows),
+    writing its per-file images to out_dir/<file stub>/ (unless plots=False).
+    Other parameters are those of analyze_wav.
+    Returns (summary_row, window_rows). Errors are reported in the summary row
+    rather than raised, so one bad file does not stop a batch.
+    Module-level and GUI-free so it can run in a worker process.
+    """
+    file_name = os.path.basename(path)
+
+    try:
+        summary_row, window_rows, freqs_full, ltas_full = analyze_wav(
+            path, fs_target, window_secs, step_secs, bandwidth, per_window_pitch, streaming, cache, dtype)
+        global_fcp = summary_row["global_FCP"]
+        if not plots:
+            return summary_row, window_rows
+
+        # matplotlib is only imported when plots are written (keeps headless runs light)
+        from fcp_plot import save_fcp_evolution_plot, save_ltas_plot_standalone
+        file_dir = os.path.join(out_dir, os.path.splitext(file_name)[0])
+        os.makedirs(file_dir, exist_ok=True)
+
+        # --- Per-file plots in its own folder ---
+        # 1) FCP evolution over time (only if we have windows)
+        if window_rows:
+            save_fcp_evolution_plot(window_rows, source="precomputed",
+                                    png_path=os.path.join(file_dir, "fcp_evolution.png"))
+
+        # 2) Global voiced-only LTAS with band highlight (if available)
+        if freqs_full is not None and ltas_full is not None and not np.isnan(global_fcp):
+            band_color = get_fcp_color(global_fcp)
+            title = f"LTAS (Global voiced-only) – {file_name}"
+            save_ltas_plot_standalone(freqs_full, ltas_full, band_color, title,
+                                      os.path.join(file_dir, "ltas_current.png"),
+                                      fcp_value=global_fcp)
+
+        return summary_row, window_rows
+
+    except Exception as file_err:
+        return error_summary_row(file_name, file_err), []
+
+def analyze_wav(path, fs_target=44100, window_secs=1.0, step_secs=0.1, bandwidth=350,
+                per_window_pitch=False, streaming=None, cache=None, dtype=np.float64):
+    """
+    Analysis part of analyze_file, without any file output (see fcp_analysis.FileAnalysis).
+    fs_target: analysis sample rate, or None to analyse at the file's own rate
+               (no resampling pass; windows, hops and bands are in s / Hz).
+    streaming: True reads/analyses the file block by block with bounded memory
+               (fcp_stream); None does so for long files (fcp_analysis.STREAMING_MIN_SECS).
+               Ignored with per_window_pitch.
+    cache: optional fcp_cache.AnalysisCache to reuse the results of a previous
+           analysis of the same audio with the same parameters.
+    dtype: np.float32 for the single-precision path (see FileAnalysis).
+    Returns (summary_row, window_rows, freqs_full, ltas_full); the global LTAS
+    is None when the file has less than 200 ms of voiced audio.
+    """
+    analysis = FileAnalysis(path, fs_target, window_secs, step_secs, bandwidth, per_window_pitch,
+                            streaming, dtype).run(cache=cache)
+    return analysis.summary_row(), analysis.window_rows(), analysis.freqs_full, analysis.ltas_full
+
+def error_summary_row(file_name, err):
+    return {
+        "filename": file_name,
+        "duration_sec": "NaN",
+        "global_Lmax_0_2": "NaN",
+        "global_Lmax_2_5": "NaN",
+        "global_Lmax_5_8": "NaN",
+        "global_Lmax_2_4": "NaN",
+        "global_FCP": "NaN",
+        "global_Trend_at_FCP_Peak": "NaN",
+        "windows_mean_FCP": "NaN",
+        "windows_sd_FCP": "NaN",
+        "windows_count": 0,
+        "error": str(err)
+    }
+
+def run_batch(paths, out_dir, workers=None, progress=None, **params):
+    """
+    Analyze many files, spreading them over a process pool.
+    workers: pool size (None = os.cpu_count(); 1 = run in this process)
+    progress: optional callback progress(done, total, file_name), called from
+              this thread as each file finishes (in completion order)
+    params: forwarded to analyze_file (fs_target, window_secs, ...)
+    Returns (summary_rows, window_rows) in the order of `paths`, whatever
+    order the files finished in.
+    """
+    paths = list(paths)
+    total = len(paths)
+    results = [None] * total
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, total))
+
+    if workers == 1:
+        for i, path in enumerate(paths):
+            results[i] = analyze_file(path, out_dir, **params)
+            if progress is not None:
+                progress(i + 1, total, os.path.basename(path))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(analyze_file, path, out_dir, **params): i for i, path in enumerate(paths)}
+            for done, future in enumerate(as_completed(futures), 1):
+                i = futures[future]
+                file_name = os.path.basename(paths[i])
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    # e.g. a worker process died (BrokenProcessPool)
+                    results[i] = (error_summary_row(file_name, e), [])
+                if progress is not None:
+                    progress(done, total, file_name)
+
+    summary_rows = [summary for summary, _ in results]
+    window_rows = [row for _, rows in results for row in rows]
+    return summary_rows, window_rows
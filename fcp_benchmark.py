@@ -0,0 +1,288 @@
+# fcp_benchmark.py
+# Times and memory-profiles every analysis stage on the bundled examples and
+# on synthetic long inputs built from them; optionally compares with a saved baseline.
+#
+#   python fcp_benchmark.py                          # examples + a 10 min synthetic file
+#   python fcp_benchmark.py --save-baseline base.json
+#   python fcp_benchmark.py --baseline base.json     # exit code 1 on a regression
+#   python fcp_benchmark.py --fft-modes              # FFT backend / float32 speed vs accuracy
+
+import argparse
+import glob
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+from scipy.io import wavfile
+import fcp_ltas
+from fcp_analysis import FileAnalysis
+from fcp_audio_io import load_wav_mono, resample_blocks
+from fcp_export import export_windows_csv
+from fcp_ltas import compute_fcp_batch, compute_fcp_praat_style, compute_ltas_over_intervals, set_fft_backend
+from fcp_results import WindowResults
+from fcp_voiced_ltas import (compute_ltas_voiced_like_praat, get_pitch_track, get_voiced_mask,
+                             iter_sliding_ltas_voiced, voiced_segments)
+
+# Same analysis settings as the GUI
+FS = 44100
+BUFFER_SECS = 1
+LTAS_BANDWIDTH = 350
+UPDATE_INTERVAL = 0.1
+# Rate the resample stage converts to (the examples are already at FS)
+RESAMPLE_FS = 48000
+# Length of the synthetic input made by tiling the examples
+LONG_SECS = 600
+# A stage is reported as a regression when its throughput drops by more than this fraction
+TOLERANCE = 0.15
+# Configurations compared by --fft-modes: (label, backend, workers, dtype); the first is the reference
+FFT_MODES = (
+    ("numpy f64", "numpy", 1, np.float64),
+    ("scipy f64", "scipy", 1, np.float64),
+    ("scipy f64 all", "scipy", -1, np.float64),
+    ("numpy f32", "numpy", 1, np.float32),
+    ("scipy f32", "scipy", 1, np.float32),
+    ("scipy f32 all", "scipy", -1, np.float32),
+)
+
+def example_paths():
+    return sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "examples", "*.wav")))
+
+def make_long_input(paths, secs, out_path):
+    """Write a WAV of `secs` seconds made by repeating the example files (resampled to FS) end to end."""
+    parts = [load_wav_mono(p, FS, cache=False)[0] for p in paths]
+    take = np.concatenate(parts)
+    n = int(secs * FS)
+    y = np.tile(take, -(-n // len(take)))[:n]
+    wavfile.write(out_path, FS, np.clip(y, -32768, 32767).astype(np.int16))
+    return out_path
+
+def measure(func, repeat=1):
+    """
+    Run func() once under tracemalloc for its peak memory (this also warms up
+    imports and caches), then repeat times untraced for the timing.
+    Returns (result, best seconds, peak traced bytes).
+    """
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    best = np.inf
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - t0)
+    return result, best, peak
+
+def benchmark_file(path, repeat=1, plots=True):
+    """
+    Benchmark each analysis stage on one file. Every stage runs the code the
+    GUI and fcp_batch use, on the output of the previous stages.
+    Returns {"filename", "audio_secs", "stages": {stage: {"secs", "peak_mb", "x_realtime"}}}.
+    """
+    stages = {}
+    state = {}
+
+    def run(stage, func):
+        result, secs, peak = measure(func, repeat)
+        stages[stage] = {"secs": secs, "peak_mb": peak / 2 ** 20}
+        return result
+
+    data, fs = run("decode", lambda: load_wav_mono(path, None, cache=False))
+    audio_secs = len(data) / fs
+    run("resample", lambda: resample_blocks(data, fs, RESAMPLE_FS))
+    if fs != FS:
+        data, fs = load_wav_mono(path, FS, cache=False)
+    win_samples = int(BUFFER_SECS * fs)
+    step_samples = int(UPDATE_INTERVAL * fs)
+
+    pitch_track = run("pitch", lambda: get_pitch_track(data, fs))
+    mask = run("voiced_mask", lambda: get_voiced_mask(data, fs, pitch_track))
+    run("voiced_ltas", lambda: compute_ltas_voiced_like_praat(data, fs, LTAS_BANDWIDTH, mask=mask))
+
+    def sliding():
+        return list(iter_sliding_ltas_voiced(data, fs, win_samples, step_samples, bandwidth=LTAS_BANDWIDTH,
+                                             mask=mask))
+    windows = run("sliding", sliding)
+    windows = [(start, freqs, ltas) for start, freqs, ltas in windows if len(ltas) and not np.isnan(ltas).all()]
+
+    def fcp():
+        rows = WindowResults(os.path.basename(path))
+        if not windows:
+            return rows
+        metrics = compute_fcp_batch(windows[0][1], np.stack([ltas for _, _, ltas in windows]))
+        for (start, freqs, ltas), (L0_2, L2_5, L5_8, L2_4, fcp_w, trend) in zip(windows, zip(*metrics)):
+            rows.append({"window_start_sec": start / fs, "window_end_sec": (start + win_samples) / fs,
+                         "Lmax_0_2": L0_2, "Lmax_2_5": L2_5, "Lmax_5_8": L5_8, "Lmax_2_4": L2_4, "FCP": fcp_w,
+                         "Trend_at_FCP_Peak": trend, "freqs": freqs, "ltas": ltas})
+        return rows
+    state["rows"] = run("fcp", fcp)
+
+    def global_fcp():
+        seg_starts, seg_ends = voiced_segments(pitch_track, fs)
+        freqs, ltas = compute_ltas_over_intervals(data, fs, seg_starts, seg_ends, bandwidth=LTAS_BANDWIDTH)
+        return freqs, ltas, compute_fcp_praat_style(freqs, ltas)[4]
+    freqs_full, ltas_full, state["global_fcp"] = run("global", global_fcp)
+    # Everything above but export/plot in one FileAnalysis pass (what LOAD and BATCH run)
+    run("file_analysis", lambda: FileAnalysis(path, FS, BUFFER_SECS, UPDATE_INTERVAL, LTAS_BANDWIDTH,
+                                              streaming=False).run())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        run("export", lambda: export_windows_csv(state["rows"], os.path.join(tmp, "windows.csv")))
+        if plots:
+            from fcp_plot import save_fcp_evolution_plot, save_ltas_plot_standalone
+
+            def plot():
+                save_fcp_evolution_plot(state["rows"], "precomputed", os.path.join(tmp, "fcp_evolution.png"))
+                save_ltas_plot_standalone(freqs_full, ltas_full, "#1f77b4", "LTAS", os.path.join(tmp, "ltas.png"),
+                                          fcp_value=state["global_fcp"])
+            run("plot", plot)
+
+    for stage in stages.values():
+        stage["x_realtime"] = audio_secs / stage["secs"] if stage["secs"] > 0 else np.inf
+    return {"filename": os.path.basename(path), "audio_secs": audio_secs, "stages": stages}
+
+def max_abs_diff(a, b):
+    diff = np.abs(np.asarray(a, dtype=float) - np.asarray(b, dtype=float))
+    return float(np.nanmax(diff)) if diff.size else 0.0
+
+def benchmark_fft_modes(path, repeat=1):
+    """
+    Speed and accuracy of each FFT_MODES configuration on one file: decoding in
+    the mode's dtype, then the frame-FFT stages (voiced sliding windows, their
+    FCP, global voiced LTAS) on one shared pitch track and voicing mask.
+    Accuracy is the largest deviation of any LTAS band (window or global) and
+    of any FCP value from the first mode.
+    Returns {"filename", "audio_secs", "modes": [{"mode", "secs", "x_realtime", "peak_mb", "max_db", "max_fcp"}]}.
+    """
+    data, fs = load_wav_mono(path, FS, cache=False)
+    pitch_track = get_pitch_track(data, fs)
+    mask = get_voiced_mask(data, fs, pitch_track)
+    seg_starts, seg_ends = voiced_segments(pitch_track, fs)
+    audio_secs = len(data) / fs
+    del data
+
+    def analyse(dtype):
+        y = load_wav_mono(path, FS, cache=False, dtype=dtype)[0]
+        windows = [(freqs, ltas) for _, freqs, ltas in iter_sliding_ltas_voiced(
+            y, fs, int(BUFFER_SECS * fs), int(UPDATE_INTERVAL * fs), bandwidth=LTAS_BANDWIDTH, mask=mask)
+            if len(ltas) and not np.isnan(ltas).all()]
+        ltas_windows = np.stack([ltas for _, ltas in windows]) if windows else np.zeros((0, 0))
+        fcp_windows = compute_fcp_batch(windows[0][0], ltas_windows)[4] if windows else np.zeros(0)
+        freqs_full, ltas_full = compute_ltas_over_intervals(y, fs, seg_starts, seg_ends, bandwidth=LTAS_BANDWIDTH)
+        fcp_full = compute_fcp_praat_style(freqs_full, ltas_full)[4] if len(ltas_full) else np.nan
+        return ltas_windows, ltas_full, np.append(fcp_windows, fcp_full)
+
+    previous = (fcp_ltas.FFT_BACKEND, fcp_ltas.FFT_WORKERS)
+    results = []
+    reference = None
+    try:
+        for label, backend, workers, dtype in FFT_MODES:
+            set_fft_backend(backend, workers)
+            (ltas_windows, ltas_full, fcps), secs, peak = measure(lambda: analyse(dtype), repeat)
+            if reference is None:
+                reference = (ltas_windows, ltas_full, fcps)
+            results.append({
+                "mode": label,
+                "secs": secs,
+                "x_realtime": audio_secs / secs if secs > 0 else np.inf,
+                "peak_mb": peak / 2 ** 20,
+                "max_db": max(max_abs_diff(ltas_windows, reference[0]), max_abs_diff(ltas_full, reference[1])),
+                "max_fcp": max_abs_diff(fcps, reference[2]),
+            })
+    finally:
+        set_fft_backend(*previous)
+    return {"filename": os.path.basename(path), "audio_secs": audio_secs, "modes": results}
+
+def print_fft_report(result):
+    print(f"{result['filename'][:20]} ({result['audio_secs']:.0f} s), {os.cpu_count()} CPU cores")
+    print(f"  {'mode':<15}{'secs':>9}{'x realtime':>12}{'peak MB':>9}{'max dB':>11}{'max FCP':>11}")
+    for r in result["modes"]:
+        print(f"  {r['mode']:<15}{r['secs']:>9.3f}{r['x_realtime']:>12.1f}{r['peak_mb']:>9.1f}"
+              f"{r['max_db']:>11.2e}{r['max_fcp']:>11.2e}")
+
+def compare_with_baseline(results, baseline, tolerance=TOLERANCE):
+    """
+    Throughput ratio (current / baseline) per file and stage, for the files and
+    stages present in both. Returns (ratios, regressions) where regressions
+    lists (filename, stage, ratio) with ratio < 1 - tolerance.
+    """
+    base = {r["filename"]: r["stages"] for r in baseline["results"]}
+    ratios = {}
+    regressions = []
+    for r in results:
+        if r["filename"] not in base:
+            continue
+        for stage, m in r["stages"].items():
+            if stage not in base[r["filename"]]:
+                continue
+            ratio = m["x_realtime"] / base[r["filename"]][stage]["x_realtime"]
+            ratios[(r["filename"], stage)] = ratio
+            if ratio < 1 - tolerance:
+                regressions.append((r["filename"], stage, ratio))
+    return ratios, regressions
+
+def print_report(results, ratios=None):
+    ratios = ratios or {}
+    print(f"{'file':<28}{'stage':<13}{'secs':>9}{'x realtime':>12}{'peak MB':>9}{'vs base':>9}")
+    for r in results:
+        name = f"{r['filename'][:20]} ({r['audio_secs']:.0f} s)"
+        for stage, m in r["stages"].items():
+            ratio = ratios.get((r["filename"], stage))
+            vs = f"{ratio:>8.2f}x" if ratio is not None else f"{'':>9}"
+            print(f"{name:<28}{stage:<13}{m['secs']:>9.3f}{m['x_realtime']:>12.1f}{m['peak_mb']:>9.1f}{vs}")
+            name = ""
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-stage timing and peak memory of the FCP analysis.")
+    parser.add_argument("wavs", nargs="*", help="WAV files (default: examples/*.wav)")
+    parser.add_argument("--long-secs", type=float, default=LONG_SECS,
+                        help=f"length of the synthetic input tiled from the files, 0 to skip (default {LONG_SECS})")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage on the short files (best is kept)")
+    parser.add_argument("--no-plots", action="store_true", help="skip the plot stage")
+    parser.add_argument("--save-baseline", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare with results saved by --save-baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help=f"allowed throughput drop before a stage counts as a regression (default {TOLERANCE})")
+    parser.add_argument("--fft-modes", action="store_true",
+                        help="compare the FFT backends and float32 path (speed vs accuracy) instead of the stages")
+    args = parser.parse_args(argv)
+    paths = args.wavs or example_paths()
+
+    if args.fft_modes:
+        for p in paths:
+            print_fft_report(benchmark_fft_modes(p, args.repeat))
+        if args.long_secs > 0:
+            with tempfile.TemporaryDirectory() as tmp:
+                long_path = make_long_input(paths, args.long_secs,
+                                            os.path.join(tmp, f"synthetic_{args.long_secs:.0f}s.wav"))
+                print_fft_report(benchmark_fft_modes(long_path, 1))
+        return 0
+
+    results = [benchmark_file(p, args.repeat, plots=not args.no_plots) for p in paths]
+    if args.long_secs > 0:
+        with tempfile.TemporaryDirectory() as tmp:
+            long_path = make_long_input(paths, args.long_secs, os.path.join(tmp, f"synthetic_{args.long_secs:.0f}s.wav"))
+            results.append(benchmark_file(long_path, 1, plots=not args.no_plots))
+
+    ratios, regressions = None, []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            ratios, regressions = compare_with_baseline(results, json.load(f), args.tolerance)
+    print_report(results, ratios)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "numpy": np.__version__, "machine": platform.machine(),
+                       "fft_backend": fcp_ltas.FFT_BACKEND, "results": results}, f, indent=1)
+    for file_name, stage, ratio in regressions:
+        print(f"REGRESSION {file_name} {stage}: {ratio:.2f}x baseline throughput", file=sys.stderr)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+# fcp_cache.py
+
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+
+# Default location and size bound of the on-disk analysis cache
+CACHE_DIR = os.environ.get("FCP_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".fcp_cache"))
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+# Bump when the analysis changes in a way that invalidates cached results
+CACHE_VERSION = 2
+HASH_BLOCK = 1 << 20
+
+def file_content_hash(path):
+    """SHA-256 of the file's bytes (so renamed/copied takes still hit the cache)."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+class AnalysisCache:
+    """
+    Persistent cache of analysis results as compressed .npz files.
+
+    Entries are keyed by the audio file's content hash plus every analysis
+    parameter, so a result is reused only for identical audio analysed the
+    same way. A hit refreshes the entry's modification time; after each
+    store the least recently used entries are deleted until the directory is
+    below max_bytes. Writes go through a temporary file and os.replace, so
+    several processes (BATCH workers) can share one cache directory.
+    Cache problems (unwritable directory, corrupt entry) never fail an
+    analysis: they are treated as a miss.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._hashes = {}  # (path, size, mtime) -> content hash, for this process
+
+    def key(self, path, **params):
+        """Cache key for analysing `path` with the given parameters."""
+        st = os.stat(path)
+        stamp = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+        if stamp not in self._hashes:
+            self._hashes[stamp] = file_content_hash(path)
+        desc = json.dumps({"version": CACHE_VERSION, "audio": self._hashes[stamp], **params}, sort_keys=True)
+        return hashlib.sha256(desc.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".npz")
+
+    def load(self, key):
+        """Return the stored dict of arrays, or None on a miss."""
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as npz:
+                arrays = {name: npz[name] for name in npz.files}
+            os.utime(path)  # mark as recently used
+            return arrays
+        except Exception:
+            return None
+
+    def save(self, key, arrays):
+        """Store a dict of arrays under key, then evict old entries."""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    np.savez_compressed(f, **arrays)
+                os.replace(tmp, self._path(key))
+            except Exception:
+                os.remove(tmp)
+                raise
+            self.evict()
+        except Exception as e:
+            print("Analysis cache not updated:", e)
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".npz"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue  # removed by another process
+            entries.append((st.st_mtime_ns, st.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith(".npz"):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
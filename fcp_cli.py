@@ -0,0 +1,122 @@
+# fcp_cli.py
+# Headless entry point: single-file and batch FCP analysis without the GUI.
+# Imports only the numeric modules (matplotlib only when plots are requested).
+#
+#   python fcp_cli.py analyze take.wav [--csv windows.csv] [--out-dir DIR]
+#   python fcp_cli.py batch *.wav [--out-dir DIR] [--workers N] [--no-plots]
+
+import argparse
+import json
+import os
+import sys
+import numpy as np
+from fcp_batch import analyze_file, analyze_wav, run_batch
+from fcp_cache import CACHE_DIR, AnalysisCache
+from fcp_export import ensure_exports_dir, export_batch_excel, write_rows_csv
+from fcp_ltas import set_fft_backend
+
+# Same analysis settings as the GUI
+FS = 44100
+BUFFER_SECS = 1
+LTAS_BANDWIDTH = 350
+UPDATE_INTERVAL = 0.1
+
+def analysis_params(args):
+    """analyze_wav/analyze_file keyword arguments from parsed command-line options."""
+    return {
+        "fs_target": None if args.fs == "native" else int(args.fs),
+        "window_secs": args.window,
+        "step_secs": args.step,
+        "bandwidth": args.bandwidth,
+        "per_window_pitch": args.per_window_pitch,
+        "streaming": args.streaming,
+        "cache": None if args.no_cache else AnalysisCache(args.cache_dir),
+        "dtype": np.float32 if args.float32 else np.float64,
+    }
+
+def cmd_analyze(args):
+    params = analysis_params(args)
+    if args.out_dir:
+        summary_row, window_rows = analyze_file(args.wav, args.out_dir, **params)
+        if "error" in summary_row:
+            raise RuntimeError(summary_row["error"])
+    else:
+        summary_row, window_rows, _, _ = analyze_wav(args.wav, **params)
+    if args.csv:
+        write_rows_csv(window_rows, args.csv)
+    if args.json:
+        print(json.dumps(summary_row, default=float))
+    else:
+        for key, value in summary_row.items():
+            print(f"{key}: {value:.2f}" if isinstance(value, float) and not np.isnan(value) else f"{key}: {value}")
+    return 0
+
+def cmd_batch(args):
+    out_dir = args.out_dir or ensure_exports_dir(prefix="Batch")
+    os.makedirs(out_dir, exist_ok=True)
+
+    def report_progress(done, total, file_name):
+        if not args.quiet:
+            print(f"[{done}/{total}] {file_name}", file=sys.stderr)
+
+    summary_rows, window_rows = run_batch(args.wavs, out_dir, workers=args.workers, progress=report_progress,
+                                          plots=not args.no_plots, **analysis_params(args))
+    write_rows_csv(summary_rows, os.path.join(out_dir, "batch_summary.csv"))
+    write_rows_csv(window_rows, os.path.join(out_dir, "batch_windows.csv"))
+    export_batch_excel(summary_rows, window_rows, os.path.join(out_dir, "batch_results.xlsx"))
+    failed = [row for row in summary_rows if "error" in row]
+    for row in failed:
+        print(f"{row['filename']}: {row['error']}", file=sys.stderr)
+    print(out_dir)
+    return 1 if failed else 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="fcp_cli", description="FCP analysis of WAV files without the GUI.")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--fs", default=str(FS),
+                        help=f"analysis sample rate in Hz, or 'native' for the file's own rate (default {FS})")
+    common.add_argument("--window", type=float, default=BUFFER_SECS, help="sliding window length (s)")
+    common.add_argument("--step", type=float, default=UPDATE_INTERVAL, help="sliding window step (s)")
+    common.add_argument("--bandwidth", type=float, default=LTAS_BANDWIDTH, help="LTAS band width (Hz)")
+    common.add_argument("--per-window-pitch", action="store_true",
+                        help="track pitch inside every window (legacy, much slower)")
+    common.add_argument("--streaming", action=argparse.BooleanOptionalAction, default=None,
+                        help="force/disable out-of-core analysis (default: automatic for long files)")
+    common.add_argument("--cache-dir", default=CACHE_DIR, help="analysis cache directory")
+    common.add_argument("--no-cache", action="store_true", help="do not read or write the analysis cache")
+    common.add_argument("--fft", choices=("numpy", "scipy"), default=None,
+                        help="FFT backend (default numpy, or FCP_FFT_BACKEND)")
+    common.add_argument("--fft-workers", type=int, default=1,
+                        help="threads per batched FFT with --fft scipy (-1 = all cores)")
+    common.add_argument("--float32", action="store_true",
+                        help="decode and compute spectra in single precision (faster; FCP within ~0.001 dB)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("analyze", parents=[common], help="analyse one file and print its summary")
+    p.add_argument("wav")
+    p.add_argument("--csv", help="write the per-window rows to this CSV file")
+    p.add_argument("--out-dir", help="also write the FCP evolution and LTAS plots under this folder")
+    p.add_argument("--json", action="store_true", help="print the summary as one JSON object")
+    p.set_defaults(func=cmd_analyze)
+
+    p = sub.add_parser("batch", parents=[common], help="analyse many files like the GUI's BATCH button")
+    p.add_argument("wavs", nargs="+")
+    p.add_argument("--out-dir", help="output folder (default: Exports/Batch_<timestamp>)")
+    p.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU core)")
+    p.add_argument("--no-plots", action="store_true", help="skip the per-file PNG plots")
+    p.add_argument("--quiet", action="store_true", help="no progress output")
+    p.set_defaults(func=cmd_batch)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.fft is not None:
+        set_fft_backend(args.fft, args.fft_workers)
+    try:
+        return args.func(args)
+    except Exception as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
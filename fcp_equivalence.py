@@ -0,0 +1,209 @@
+# fcp_equivalence.py
+# Runs the reference (loop-based, fcp_reference) and the optimized analysis side
+# by side on the example WAVs and on randomized signals, and reports how far the
+# optimized results deviate. Exit code 1 when any check exceeds the tolerance.
+#
+#   python fcp_equivalence.py [files.wav ...] [--random N] [--seed S] [--atol DB]
+
+import argparse
+import glob
+import os
+import sys
+import numpy as np
+import fcp_reference as ref
+from fcp_audio_io import load_wav_mono
+from fcp_batch import analyze_wav
+from fcp_ltas import compute_fcp_batch, compute_fcp_praat_style, compute_ltas_like_praat
+from fcp_voiced_ltas import (compute_ltas_voiced_like_praat, extract_only_voiced_segments, get_voiced_mask,
+                             iter_sliding_ltas_voiced)
+
+# Same analysis settings as the GUI
+FS = 44100
+BUFFER_SECS = 1
+LTAS_BANDWIDTH = 350
+UPDATE_INTERVAL = 0.1
+# Largest accepted deviation (dB) of any LTAS band or FCP value
+ATOL = 1e-6
+FCP_KEYS = ("Lmax_0_2", "Lmax_2_5", "Lmax_5_8", "Lmax_2_4", "FCP")
+
+def max_deviation(a, b):
+    """Largest |a - b| over matching entries; NaN must match NaN; inf on a shape or NaN mismatch."""
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    if a.shape != b.shape:
+        return np.inf
+    nan_a, nan_b = np.isnan(a), np.isnan(b)
+    if (nan_a != nan_b).any():
+        return np.inf
+    diff = np.abs(a[~nan_a] - b[~nan_b])
+    return float(diff.max()) if diff.size else 0.0
+
+def check(signal, name, db=np.nan, fcp=np.nan, disagree=0, total=1):
+    return {"signal": signal, "check": name, "max_db": db, "max_fcp": fcp, "disagree": disagree, "total": total}
+
+def compare_signal(y, fs, signal, atol=ATOL):
+    """
+    Component checks on one signal: plain LTAS, voicing mask, voiced segments,
+    voiced LTAS, FCP of the LTAS and every sliding window (one by one and batched). Both engines share
+    one Praat pitch track (pitch tracking itself is not reimplemented).
+    """
+    results = []
+    win_samples = int(BUFFER_SECS * fs)
+    step_samples = int(UPDATE_INTERVAL * fs)
+    pitch_track = ref.get_pitch_track(y, fs)
+
+    ref_freqs, ref_ltas = ref.compute_ltas_like_praat(y, fs, LTAS_BANDWIDTH)
+    freqs, ltas = compute_ltas_like_praat(y, fs, LTAS_BANDWIDTH)
+    results.append(check(signal, "ltas", db=max(max_deviation(ref_freqs, freqs), max_deviation(ref_ltas, ltas))))
+    if len(ref_ltas):
+        dev = max_deviation(ref.compute_fcp_praat_style(ref_freqs, ref_ltas),
+                            compute_fcp_praat_style(ref_freqs, ref_ltas))
+        results.append(check(signal, "fcp", fcp=dev))
+
+    ref_mask = ref.get_voiced_mask(y, fs, pitch_track)
+    mask = get_voiced_mask(y, fs, pitch_track)
+    disagree = int(np.count_nonzero(ref_mask != mask)) if len(mask) == len(ref_mask) else len(y)
+    results.append(check(signal, "voiced_mask", disagree=disagree, total=len(y)))
+
+    ref_voiced = ref.extract_only_voiced_segments(y, fs, pitch_track)
+    voiced = extract_only_voiced_segments(y, fs, pitch_track=pitch_track)
+    disagree = int(np.count_nonzero(ref_voiced != voiced)) if len(voiced) == len(ref_voiced) else len(y)
+    results.append(check(signal, "voiced_segments", disagree=disagree, total=max(len(ref_voiced), 1)))
+
+    ref_freqs, ref_ltas = ref.compute_ltas_voiced_like_praat(y, fs, LTAS_BANDWIDTH, mask=ref_mask)
+    freqs, ltas = compute_ltas_voiced_like_praat(y, fs, LTAS_BANDWIDTH, mask=ref_mask)
+    results.append(check(signal, "voiced_ltas",
+                         db=max(max_deviation(ref_freqs, freqs), max_deviation(ref_ltas, ltas))))
+
+    ref_rows = {row[0]: row for row in ref.sliding_windows(y, fs, win_samples, step_samples, LTAS_BANDWIDTH,
+                                                            mask=ref_mask)}
+    max_db = max_fcp = 0.0
+    disagree = total = 0
+    kept_rows = []
+    for start, freqs, ltas in iter_sliding_ltas_voiced(y, fs, win_samples, step_samples,
+                                                       bandwidth=LTAS_BANDWIDTH, mask=ref_mask):
+        kept = len(ltas) >= 1 and not np.isnan(ltas).all()
+        total += 1
+        if kept != (start in ref_rows):
+            disagree += 1
+            continue
+        if not kept:
+            continue
+        row = ref_rows[start]
+        kept_rows.append(row)
+        db = max_deviation(row[7], ltas)
+        fcp = max_deviation(row[1:6], compute_fcp_praat_style(freqs, ltas)[:5])
+        max_db, max_fcp = max(max_db, db), max(max_fcp, fcp)
+        disagree += db > atol or fcp > atol
+    results.append(check(signal, "sliding", db=max_db, fcp=max_fcp, disagree=disagree, total=total))
+
+    # All window metrics at once from the matrix of reference window LTAS
+    if kept_rows:
+        batch = np.column_stack(compute_fcp_batch(kept_rows[0][6], np.stack([row[7] for row in kept_rows]))[:5])
+        devs = [max_deviation(row[1:6], values) for row, values in zip(kept_rows, batch)]
+        results.append(check(signal, "fcp_batch", fcp=max(devs), disagree=sum(d > atol for d in devs),
+                             total=len(devs)))
+    return results
+
+def compare_file(path, atol=ATOL):
+    """
+    compare_signal on the file's audio, plus an end-to-end check of the
+    production analysis (fcp_batch.analyze_wav, no cache) against the reference:
+    global LTAS/metrics and per-window metrics, windows matched by start time.
+    """
+    signal = os.path.basename(path)
+    y, fs = load_wav_mono(path, FS)
+    results = compare_signal(y, fs, signal, atol)
+
+    pitch_track = ref.get_pitch_track(y, fs)
+    voiced = ref.extract_only_voiced_segments(y, fs, pitch_track)
+    ref_freqs, ref_ltas = ref.compute_ltas_like_praat(voiced, fs, LTAS_BANDWIDTH)
+    summary, rows, freqs, ltas = analyze_wav(path, FS, BUFFER_SECS, UPDATE_INTERVAL, LTAS_BANDWIDTH,
+                                             streaming=False)
+    if len(voiced) >= int(0.2 * fs):
+        ref_global = ref.compute_fcp_praat_style(ref_freqs, ref_ltas)[:5]
+        db = max(max_deviation(ref_freqs, freqs), max_deviation(ref_ltas, ltas))
+    else:
+        ref_global = (np.nan,) * 5
+        db = 0.0 if ltas is None else np.inf
+    fcp = max_deviation(ref_global, [summary["global_" + k] for k in FCP_KEYS])
+    results.append(check(signal, "global", db=db, fcp=fcp, disagree=int(db > atol or fcp > atol)))
+
+    ref_rows = {row[0] / fs: row for row in ref.sliding_windows(
+        y, fs, int(BUFFER_SECS * fs), int(UPDATE_INTERVAL * fs), LTAS_BANDWIDTH,
+        mask=ref.get_voiced_mask(y, fs, pitch_track))}
+    rows = {row["window_start_sec"]: row for row in rows}
+    max_fcp = 0.0
+    disagree = len(ref_rows.keys() ^ rows.keys())
+    for t in ref_rows.keys() & rows.keys():
+        fcp = max_deviation(ref_rows[t][1:6], [rows[t][k] for k in FCP_KEYS])
+        max_fcp = max(max_fcp, fcp)
+        disagree += fcp > atol
+    results.append(check(signal, "windows", fcp=max_fcp, disagree=disagree, total=len(ref_rows.keys() | rows.keys())))
+    return results
+
+def random_signal(rng, fs):
+    """
+    Sung-like test signal of random length (including shorter than one frame):
+    a harmonic tone with random f0, vibrato and spectral tilt, switched on and
+    off by a random envelope (so voicing changes), plus noise.
+    """
+    n = int(rng.uniform(0.02, 4.0) * fs)
+    t = np.arange(n) / fs
+    f0 = rng.uniform(90, 500) * (1 + 0.02 * np.sin(2 * np.pi * rng.uniform(4, 7) * t))
+    phase = 2 * np.pi * np.cumsum(f0) / fs
+    tilt = rng.uniform(6, 15)
+    y = sum(10 ** (-tilt * np.log2(k) / 20) * np.sin(k * phase) for k in range(1, 30))
+    gate = np.repeat(rng.random(n // int(0.25 * fs) + 1) < 0.7, int(0.25 * fs))[:n]
+    y = 8000 * y * gate + rng.normal(0, rng.uniform(1, 300), n)
+    return y
+
+def compare_random(count, seed, atol=ATOL):
+    """compare_signal on `count` random signals, plus FCP (one by one and batched) on random LTAS curves."""
+    rng = np.random.default_rng(seed)
+    results = []
+    for i in range(count):
+        results.extend(compare_signal(random_signal(rng, FS), FS, f"random_{i}", atol))
+    freqs = ref.compute_ltas_like_praat(np.zeros(int(0.04 * FS)), FS, LTAS_BANDWIDTH)[0]
+    curves = rng.normal(-20, 15, (200, len(freqs))) + np.linspace(40, -40, len(freqs))
+    dev = max(max_deviation(ref.compute_fcp_praat_style(freqs, c), compute_fcp_praat_style(freqs, c))
+              for c in curves)
+    results.append(check("random_ltas", "fcp", fcp=dev, disagree=int(dev > atol), total=len(curves)))
+    batch = np.column_stack(compute_fcp_batch(freqs, curves))
+    devs = [max_deviation(ref.compute_fcp_praat_style(freqs, c), values) for c, values in zip(curves, batch)]
+    results.append(check("random_ltas", "fcp_batch", fcp=max(devs), disagree=sum(d > atol for d in devs),
+                         total=len(curves)))
+    return results
+
+def failed(r, atol=ATOL):
+    return r["disagree"] > 0 or np.nanmax([r["max_db"], r["max_fcp"], 0.0]) > atol
+
+def print_report(results, atol=ATOL):
+    print(f"{'signal':<24}{'check':<17}{'max dB':>11}{'max FCP':>11}{'disagree':>15}  status")
+    for r in results:
+        db = "" if np.isnan(r["max_db"]) else f"{r['max_db']:.2e}"
+        fcp = "" if np.isnan(r["max_fcp"]) else f"{r['max_fcp']:.2e}"
+        status = "FAIL" if failed(r, atol) else "ok"
+        print(f"{r['signal'][:23]:<24}{r['check']:<17}{db:>11}{fcp:>11}"
+              f"{str(r['disagree']) + '/' + str(r['total']):>15}  {status}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reference vs optimized FCP analysis, side by side.")
+    parser.add_argument("wavs", nargs="*", help="WAV files (default: examples/*.wav)")
+    parser.add_argument("--random", type=int, default=20, help="number of random signals (default 20)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--atol", type=float, default=ATOL, help=f"tolerance in dB (default {ATOL})")
+    args = parser.parse_args(argv)
+    paths = args.wavs or sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                       "examples", "*.wav")))
+    results = []
+    for path in paths:
+        results.extend(compare_file(path, args.atol))
+    results.extend(compare_random(args.random, args.seed, args.atol))
+    print_report(results, args.atol)
+    n_failed = sum(failed(r, args.atol) for r in results)
+    print(f"{len(results) - n_failed}/{len(results)} checks within {args.atol:g} dB")
+    return 1 if n_failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
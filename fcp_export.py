@@ -0,0 +1,94 @@
+# fcp_export.py
+
+import csv
+import os
+from datetime import datetime  # for timestamped export folders
+import numpy as np
+from fcp_results import METRICS
+
+# Columns of the per-window CSV/Excel exports, and the ones averaged in the 'Global Mean' row
+WINDOW_FIELDS = ["filename", *METRICS]
+MEAN_FIELDS = [name for name in METRICS if name not in ("window_start_sec", "window_end_sec")]
+
+def ensure_exports_dir(prefix="Export"):
+    """
+    Create a timestamped directory under ./Exports/ and return its path.
+    """
+    base = "Exports"
+    os.makedirs(base, exist_ok=True)
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    out_dir = os.path.join(base, f"{prefix}_{ts}")
+    os.makedirs(out_dir, exist_ok=True)
+    return out_dir
+
+def export_windows_csv(export_data, save_path):
+    """
+    Write export_data (WindowResults) to CSV including a final 'Global Mean' row
+    when numeric fields exist.
+    """
+    with open(save_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=WINDOW_FIELDS)
+        writer.writeheader()
+        # Only write allowed keys
+        writer.writerows(export_data.rows(WINDOW_FIELDS))
+        # Global means (per column, over the windows where the metric is defined)
+        global_means = {"filename": "Global Mean"}
+        for field in MEAN_FIELDS:
+            mean = export_data.nanmean(field)
+            global_means[field] = "NaN" if np.isnan(mean) else round(mean, 2)
+        writer.writerow(global_means)
+
+def write_rows_csv(rows, path):
+    """
+    Write arbitrary list[dict] rows to CSV with inferred headers.
+    """
+    if not rows:
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            pass
+        return
+    # infer headers from union of keys preserving a reasonable order
+    keys = set()
+    for r in rows:
+        keys.update(r.keys())
+    ordered = ["filename"] + sorted(k for k in keys if k != "filename")
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=ordered)
+        writer.writeheader()
+        for r in rows:
+            writer.writerow({k: r.get(k, "") for k in ordered})
+
+def export_windows_excel(export_data, xlsx_path):
+    """
+    Try to write export_data (WindowResults) into an Excel file.
+    If pandas is not available, silently skip.
+    """
+    try:
+        import pandas as pd
+        # results columns as a DataFrame with the standard columns
+        df = pd.DataFrame(export_data.to_columns(WINDOW_FIELDS))
+        # Global means row
+        if not df.empty:
+            means = {"filename": "Global Mean"}
+            for nf in MEAN_FIELDS:
+                means[nf] = round(export_data.nanmean(nf), 2)
+            df_means = pd.DataFrame([means])
+            with pd.ExcelWriter(xlsx_path, engine='xlsxwriter') as writer:
+                df.to_excel(writer, index=False, sheet_name="data")
+                df_means.to_excel(writer, index=False, sheet_name="summary")
+    except Exception:
+        # quietly skip if pandas/xlsxwriter is not available
+        pass
+
+def export_batch_excel(summary_rows, window_rows, xlsx_path):
+    """
+    Write batch results to Excel with two sheets if pandas is available.
+    """
+    try:
+        import pandas as pd
+        df_summary = pd.DataFrame(summary_rows)
+        df_windows = pd.DataFrame(window_rows)
+        with pd.ExcelWriter(xlsx_path, engine='xlsxwriter') as writer:
+            df_summary.to_excel(writer, index=False, sheet_name="summary")
+            df_windows.to_excel(writer, index=False, sheet_name="windows")
+    except Exception:
+        pass
@@ -0,0 +1,111 @@
+# fcp_file_loader.py
+
+import os
+import threading
+import time
+import numpy as np
+from fcp_analysis import FileAnalysis
+from fcp_audio_io import load_wav_mono
+
+class FileAnalysisLoader(threading.Thread):
+    """
+    Background analysis of a loaded file for PLAY mode.
+
+    Decodes the file (for playback) and runs its fcp_analysis.FileAnalysis
+    in streaming mode (region-by-region pitch tracking), so each sliding-window
+    row is appended to `rows` (a WindowResults) in time order as soon as it is ready.
+    Playback can start on the analysed prefix while the rest of the file is
+    still being processed. The global voiced FCP is available at the end.
+
+    Callbacks run in this thread (use root.after to touch Tk widgets):
+      on_progress(loader)  after each window, at most every `progress_interval` s
+      on_done(loader)      once at the end, also after an error or cancel()
+    Progress is in `analysed_secs` / `duration_secs`; the results of the first
+    window (start 0) are in `first_window`, the global FCP in `global_fcp`.
+    cache: optional fcp_cache.AnalysisCache; a file analysed before with the
+           same parameters (here or by a streaming batch run) is restored from
+           it instead of being re-analysed.
+    dtype: np.float32 decodes and analyses in single precision; `data` is
+           then float32 too, as playback wants it.
+    """
+
+    def __init__(self, wav_path, fs_target, window_secs=1.0, step_secs=0.1, bandwidth=350,
+                 per_window_pitch=False, rows=None, on_progress=None, on_done=None,
+                 progress_interval=0.1, cache=None, dtype=np.float64):
+        super().__init__(daemon=True)
+        self.wav_path = wav_path
+        self.filename = os.path.basename(wav_path)
+        self.fs_target = fs_target
+        self.window_secs = window_secs
+        self.step_secs = step_secs
+        self.bandwidth = bandwidth
+        self.per_window_pitch = per_window_pitch
+        self.dtype = dtype
+        # Pitch is tracked region by region (fcp_stream), so the first windows are
+        # ready after one region instead of after tracking the whole file
+        self.analysis = FileAnalysis(wav_path, fs_target, window_secs, step_secs, bandwidth,
+                                     per_window_pitch, streaming=True, dtype=dtype, rows=rows)
+        self.rows = self.analysis.rows
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.progress_interval = progress_interval
+        self.cache = cache
+        self.data = None
+        self.fs = None
+        self.duration_secs = 0.0
+        self.finished = False
+        self.error = None
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        """Ask the thread to stop after the current window."""
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def analysed_secs(self):
+        return self.analysis.analysed_secs  # windows ending before this time are all in `rows`
+
+    @property
+    def first_window(self):
+        return self.analysis.first_window  # (freqs, ltas) of the window starting at 0
+
+    @property
+    def global_fcp(self):
+        return self.analysis.global_fcp
+
+    def run(self):
+        try:
+            self._analyse()
+        except _Cancelled:
+            pass
+        except Exception as e:
+            self.error = e
+        finally:
+            self.finished = True
+            if self.on_done is not None:
+                self.on_done(self)
+
+    def _analyse(self):
+        data, fs = load_wav_mono(self.wav_path, self.fs_target, dtype=self.dtype)
+        self.data, self.fs = data, fs
+        self.duration_secs = len(data) / fs
+        self._last_report = 0.0
+        self.analysis.run(data, fs, cache=self.cache, on_window=self._on_window,
+                          flush_interval=self.progress_interval)
+        if self.analysis.from_cache and self.on_progress is not None:
+            self.on_progress(self)
+
+    def _on_window(self, analysis):
+        if self.cancelled:
+            raise _Cancelled()
+        now = time.perf_counter()
+        if self.on_progress is not None and now - self._last_report >= self.progress_interval:
+            self._last_report = now
+            self.on_progress(self)
+
+class _Cancelled(Exception):
+    pass
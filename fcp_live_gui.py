@@ -1,27 +1,26 @@
+import time
+STARTUP_T0 = time.perf_counter()  # start of the startup timing report
 import tkinter as tk
 from tkinter import ttk, messagebox
 import numpy as np
 import sounddevice as sd
 from tkinter import filedialog
-from scipy.io import wavfile
-from scipy.signal import resample
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.pyplot as plt
-from fcp_ltas import compute_ltas_like_praat, compute_fcp_praat_style, get_fcp_color
-from fcp_voiced_ltas import compute_ltas_voiced_like_praat, extract_only_voiced_segments
-import parselmouth
+from functools import lru_cache
+from fcp_ltas import get_fcp_color
+from fcp_live_worker import LiveAnalysisWorker
+from fcp_cache import AnalysisCache
+from fcp_export import (ensure_exports_dir, export_batch_excel, export_windows_csv, export_windows_excel,
+                        write_rows_csv)
+from fcp_results import WindowResults
+from fcp_ring_buffer import AudioRingBuffer
 import sys
 import threading
-import time
 import os
 from PIL import Image, ImageTk
-import csv
-import statistics
-from PIL import Image, ImageTk
-import soundfile as sf
 from splash import show_splash_screen
-import sys
-from datetime import datetime  # for timestamped export folders
+# matplotlib (fcp_plot) and the file analysis modules (fcp_file_loader, fcp_batch: scipy,
+# parselmouth) take seconds to import; they are imported where used and warmed up in
+# background threads (STARTUP_TASKS while the splash is shown, ANALYSIS_MODULES afterwards)
 
 FS = 44100
 BUFFER_SECS = 1
@@ -29,6 +28,20 @@ LTAS_BANDWIDTH = 350
 UPDATE_INTERVAL = 0.1
 BUFFER_SIZE = int(FS * BUFFER_SECS)
 AUDIO_DTYPE = 'int16'
+# Re-run Praat pitch tracking inside every sliding window (legacy, ~10x slower).
+# When False, pitch is tracked once per file and the voicing mask is sliced per window.
+PER_WINDOW_PITCH = False
+# LIVE LTAS averages only voiced frames (silence and breaths are left out)
+LIVE_VOICED_ONLY = True
+# Worker processes for BATCH analysis (None = one per CPU core)
+BATCH_WORKERS = None
+# Analyse loaded/batch files at their own sample rate instead of resampling to FS
+# (window, hop and LTAS bands are defined in seconds / Hz, so results stay comparable)
+NATIVE_RATE = False
+# Decode and analyse loaded/batch files in float32 (faster, FCP within ~0.001 dB of float64)
+FLOAT32_ANALYSIS = False
+
+ANALYSIS_MODULES = ("fcp_file_loader", "fcp_batch")
 
 COLOR_CODES = [
     ('0–5 dB', '#1f77b4'),      # blue
@@ -37,6 +50,36 @@ COLOR_CODES = [
     ('15–20 dB', '#d62728')     # red
 ]
 
+@lru_cache(maxsize=1)
+def list_audio_devices():
+    """(devices, default input index, default output index), queried once per session."""
+    return sd.query_devices(), sd.default.device[0], sd.default.device[1]
+
+@lru_cache(maxsize=1)
+def load_logo():
+    """Header logo, resized once (the PhotoImage itself must be made on the Tk thread)."""
+    return Image.open("logo_fcp.png").resize((150, 150), Image.LANCZOS)
+
+def import_plotting():
+    import matplotlib.backends.backend_tkagg  # noqa: F401
+    import fcp_plot  # noqa: F401
+
+def import_analysis_modules():
+    for name in ANALYSIS_MODULES:
+        __import__(name)
+
+# Work done concurrently while the splash screen is shown (name -> callable)
+STARTUP_TASKS = {
+    "matplotlib": import_plotting,
+    "audio devices": list_audio_devices,
+    "logo": load_logo,
+}
+
+def print_startup_report(timings):
+    """Print how long each startup task took and when the main window became usable."""
+    tasks = ", ".join(f"{name} {secs:.2f} s" for name, secs in timings.items())
+    print(f"Startup: {tasks}; interactive after {time.perf_counter() - STARTUP_T0:.2f} s")
+
 class FCPLiveGUI:
     def __init__(self, root):
         self.root = root
@@ -44,13 +87,16 @@ class FCPLiveGUI:
         self.root.state('zoomed')
         self.running = False
         self.after_id = None
-        self.audio_buffer = np.zeros(BUFFER_SIZE)
+        self.audio_buffer = AudioRingBuffer(BUFFER_SIZE)  # written by the audio callback only
+        self.live_worker = None  # LIVE-mode analysis thread (LiveAnalysisWorker)
+        self.file_loader = None  # background analysis of the loaded file (FileAnalysisLoader)
+        self.analysis_cache = AnalysisCache()  # on-disk results of previously analysed files
         self.input_devices = self.get_devices(kind='input')
         self.output_devices = self.get_devices(kind='output')
         self.selected_input = tk.StringVar(value=self.input_devices[0] if self.input_devices else '')
         self.selected_output = tk.StringVar(value=self.output_devices[0] if self.output_devices else '')
-        self.analysis_history = []  # stores results for CSV (LIVE session)
-        self.precomputed_buffer = []  # Precomputed FCP buffer (file playback only)
+        self.analysis_history = WindowResults("LIVE")  # stores results for CSV (LIVE session)
+        self.precomputed_buffer = WindowResults()  # Precomputed FCP buffer (file playback only)
         self.playback_pointer = 0
         self.stop_playback = False  # stop flag used in stop_live()
         self.mode = 'idle'  # 'idle' | 'live' | 'playback'
@@ -105,8 +151,7 @@ class FCPLiveGUI:
         logo_frame = tk.Frame(header_row, bg="#e6e6e6", width=170, height=95)
         logo_frame.pack(side=tk.LEFT, anchor="n", fill=tk.Y)
         logo_frame.pack_propagate(False)
-        self.logo_img = Image.open("logo_fcp.png")
-        self.logo_img = self.logo_img.resize((150, 150), Image.LANCZOS)
+        self.logo_img = load_logo()
         self.logo_tk = ImageTk.PhotoImage(self.logo_img)
         tk.Label(logo_frame, image=self.logo_tk, bg="#e6e6e6").pack(side=tk.TOP, pady=10, padx=(10, 0))
 
@@ -131,49 +176,31 @@ class FCPLiveGUI:
             tk.Label(legend_frame, text=label, font=("Calibri", 10), bg="#e6e6e6").grid(row=i, column=1, sticky='w')
 
         # --- Spectral plot (center) ---
-        self.fig, self.ax = plt.subplots(figsize=(10, 5))
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+        from fcp_plot import LTASPlotRenderer
+        self.fig = Figure(figsize=(10, 5))
+        self.ax = self.fig.add_subplot(111)
         self.canvas = FigureCanvasTkAgg(self.fig, master=root)
         self.canvas.get_tk_widget().pack(expand=True, fill=tk.BOTH)
+        self.ltas_plot = LTASPlotRenderer(self.fig, self.ax, self.canvas)  # blitted live/playback plot
         self.plot_initialized = False
 
         self.stream = None
 
-    def fill_band_exact_2_4kHz(self, freqs, ltas, color, label="2-4kHz band"):
-        """
-        Fill the region between 2kHz and 4kHz using linear interpolation for exact boundaries.
-        """
-        band_start = 2000
-        band_end = 4000
-        # Mask for points strictly inside the band
-        mask = (freqs > band_start) & (freqs < band_end)
-        # Interpolate at boundaries if needed
-        freq_interp = np.concatenate((
-            [band_start],
-            freqs[mask],
-            [band_end]
-        ))
-        ltas_interp = np.concatenate((
-            [np.interp(band_start, freqs, ltas)],
-            ltas[mask],
-            [np.interp(band_end, freqs, ltas)]
-        ))
-        ylim_low = self.ax.get_ylim()[0]
-        self.ax.fill_between(
-            freq_interp,
-            ltas_interp,
-            y2=ylim_low,
-            color=color, alpha=0.5, label=label
-        )
+        # Import the file analysis modules in the background so LOAD/BATCH do not wait for them
+        threading.Thread(target=import_analysis_modules, daemon=True).start()
 
     def get_devices(self, kind='input'):
         devices = []
-        default_idx = sd.default.device[0] if kind == 'input' else sd.default.device[1]
-        for idx, dev in enumerate(sd.query_devices()):
+        all_devices, default_in, default_out = list_audio_devices()
+        default_idx = default_in if kind == 'input' else default_out
+        for idx, dev in enumerate(all_devices):
             if (kind == 'input' and dev['max_input_channels'] > 0) or (kind == 'output' and dev['max_output_channels'] > 0):
                 devices.append(f"{dev['name']} (index {idx})")
         # Prefer default device first
-        if devices and default_idx is not None and 0 <= default_idx < len(sd.query_devices()):
-            def_name = sd.query_devices(default_idx)['name']
+        if devices and default_idx is not None and 0 <= default_idx < len(all_devices):
+            def_name = all_devices[default_idx]['name']
             default_str = f"{def_name} (index {default_idx})"
             if default_str in devices:
                 devices.remove(default_str)
@@ -189,8 +216,7 @@ class FCPLiveGUI:
         if status:
             print(status)
         if indata.shape[1] > 0:
-            self.audio_buffer = np.roll(self.audio_buffer, -frames)
-            self.audio_buffer[-frames:] = indata[:, 0]
+            self.audio_buffer.write(indata[:, 0])
 
     def toggle_live(self):
         if not self.running:
@@ -211,7 +237,12 @@ class FCPLiveGUI:
             self.stream.close()
         self.stream = sd.InputStream(callback=self.audio_callback, channels=1, samplerate=FS,
                                      blocksize=int(FS * UPDATE_INTERVAL), dtype=AUDIO_DTYPE, device=input_idx)
+        # Analysis runs off the Tk thread; update_plot only renders its latest result
+        self.live_worker = LiveAnalysisWorker(self.audio_buffer, FS, BUFFER_SECS, bandwidth=LTAS_BANDWIDTH,
+                                              interval=UPDATE_INTERVAL, history=self.analysis_history,
+                                              voiced_only=LIVE_VOICED_ONLY)
         self.stream.start()
+        self.live_worker.start()
         self.running = True
         self.live_button.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.NORMAL)
@@ -233,6 +264,7 @@ class FCPLiveGUI:
             self.stream.stop()
             self.stream.close()
             self.stream = None
+        self.stop_worker()
         if self.after_id:
             self.root.after_cancel(self.after_id)
             self.after_id = None
@@ -249,7 +281,7 @@ class FCPLiveGUI:
                                               source="live",
                                               png_path=os.path.join(out_dir, "fcp_evolution.png"))
                 # LTAS
-                self.fig.savefig(os.path.join(out_dir, "ltas_current.png"), dpi=300)
+                self.ltas_plot.savefig(os.path.join(out_dir, "ltas_current.png"), dpi=300)
                 messagebox.showinfo("Export", f"Auto-export completed:\n{out_dir}")
         except Exception as e:
             messagebox.showwarning("Export warning", f"Auto-export skipped or failed:\n{e}")
@@ -258,100 +290,94 @@ class FCPLiveGUI:
     def load_audio(self):
         # Stop anything running, but DO NOT export when simply preparing to load a file
         self.stop_live(do_export=False)
+        self.stop_loader()
         self.analysis_history.clear()
-        self.precomputed_buffer = []
+        self.precomputed_buffer = WindowResults()
         self.playback_pointer = 0
+        self.playback_audio = None
 
         wav_path = filedialog.askopenfilename(filetypes=[("WAV files", "*.wav")])
         if not wav_path:
             return
         self.loaded_audio_filename = os.path.basename(wav_path)
-        try:
-            fs, data = wavfile.read(wav_path)
-            if data.ndim > 1:
-                data = np.mean(data, axis=1)
-            if fs != FS:
-                n_samples = int(len(data) * FS / fs)
-                data = resample(data, n_samples)
-                fs = FS
-            data = data.astype(np.float64)
-            self.loaded_audio_data = data
-            self.loaded_audio_fs = fs
-            # --- Precompute all FCP windows ---
-            win_samples = int(BUFFER_SECS * FS)
-            step_samples = int(UPDATE_INTERVAL * FS)
-            total_len = len(data)
-            # Show message while processing
-            self.fcp_label.config(text="Processing audio...", fg="gray")
+        self.loaded_audio_data = None  # set once the first windows are analysed
+        self.play_button.config(state=tk.DISABLED)
+        self.export_button.config(state=tk.DISABLED)
+        # Show message while processing
+        self.fcp_label.config(text="Processing audio...", fg="gray")
+        self.fcp_mean_label.config(text="Global FCP = -- dB")
+        from fcp_audio_io import clear_load_cache
+        from fcp_file_loader import FileAnalysisLoader
+        # The previous file's decoded audio is no longer needed once another one is loaded
+        clear_load_cache()
+        # Precompute all FCP windows in the background; rows are appended to
+        # precomputed_buffer in time order and PLAY is enabled on the first one
+        self.file_loader = FileAnalysisLoader(
+            wav_path, None if NATIVE_RATE else FS, BUFFER_SECS, UPDATE_INTERVAL,
+            bandwidth=LTAS_BANDWIDTH, per_window_pitch=PER_WINDOW_PITCH, rows=self.precomputed_buffer,
+            cache=self.analysis_cache, dtype=np.float32 if FLOAT32_ANALYSIS else np.float64,
+            on_progress=lambda loader: self.root.after(0, self._on_load_progress, loader),
+            on_done=lambda loader: self.root.after(0, self._on_load_done, loader))
+        self.file_loader.start()
+
+    def stop_loader(self):
+        if self.file_loader is not None:
+            self.file_loader.cancel()
+            self.file_loader = None
+
+    def _on_load_progress(self, loader):
+        if loader is not self.file_loader:
+            return  # superseded by a newer LOAD
+        if self.loaded_audio_data is None and self.precomputed_buffer:
+            self._show_load_preview(loader)
+        percent = 100 * loader.analysed_secs / loader.duration_secs if loader.duration_secs else 0
+        if self.loaded_audio_data is None:
+            self.fcp_label.config(text=f"Processing audio... {percent:.0f}%", fg="gray")
+        self.fcp_mean_label.config(text=f"Global FCP = -- dB (analysing {percent:.0f}%)")
+
+    def _show_load_preview(self, loader):
+        # First voiced window is ready: show the preview and allow playback of the analysed prefix
+        self.loaded_audio_data = loader.data
+        self.loaded_audio_fs = loader.fs
+        first = self.precomputed_buffer[0]
+        color = get_fcp_color(first['FCP'])
+        self.fcp_label.config(text=f"FCP = {first['FCP']:.2f} dB", fg=color)
+        # Update LTAS display (first window)
+        freqs, ltas = loader.first_window
+        self.ltas_plot.update(freqs, ltas, color,
+                              title=f"LTAS (Loaded file: {self.loaded_audio_filename}, voiced only)")
+        self.play_button.config(state=tk.NORMAL)
+
+    def _on_load_done(self, loader):
+        if loader is not self.file_loader:
+            return
+        self.file_loader = None
+        if loader.error is not None:
+            self.fcp_label.config(text="FCP = -- dB", fg='gray')
             self.fcp_mean_label.config(text="Global FCP = -- dB")
-            self.root.update()
-            for start in range(0, total_len - win_samples + 1, step_samples):
-                buf = data[start:start + win_samples]
-                freqs, ltas = compute_ltas_voiced_like_praat(buf, fs, bandwidth=LTAS_BANDWIDTH)
-                if len(ltas) < 1 or np.isnan(ltas).all():
-                    continue  # skip windows without enough voiced audio
-                Lmax_0_2, Lmax_2_5, Lmax_5_8, Lmax_2_4, fcp, trend_at_fcp_peak = compute_fcp_praat_style(freqs, ltas)
-                self.precomputed_buffer.append({
-                    "filename": self.loaded_audio_filename,
-                    "window_start_sec": start / fs,
-                    "window_end_sec": (start + win_samples) / fs,
-                    "Lmax_0_2": Lmax_0_2,
-                    "Lmax_2_5": Lmax_2_5,
-                    "Lmax_5_8": Lmax_5_8,
-                    "Lmax_2_4": Lmax_2_4,
-                    "FCP": fcp,
-                    "Trend_at_FCP_Peak": trend_at_fcp_peak,
-                    "Delta_0_2_2_5": Lmax_2_5 - Lmax_0_2,
-                    "Delta_2_5_5_8": Lmax_5_8 - Lmax_2_5,
-                    "Delta_0_2_5_8": Lmax_5_8 - Lmax_0_2,
-                    "Delta_2_4": Lmax_2_4,
-                    "freqs": freqs,
-                    "ltas": ltas
-                })
-
-            # Show preview of first window (dynamic FCP) and true global FCP (over all voiced)
-            if self.precomputed_buffer:
-                first = self.precomputed_buffer[0]
-                color = get_fcp_color(first['FCP'])
-                self.fcp_label.config(text=f"FCP = {first['FCP']:.2f} dB", fg=color)
-
-                # ------ Global FCP: calculate only on all voiced audio concatenated ------
-                voiced_full = extract_only_voiced_segments(self.loaded_audio_data, self.loaded_audio_fs)
-                if len(voiced_full) >= int(0.2 * self.loaded_audio_fs):  # at least 200 ms voiced
-                    freqs_full, ltas_full = compute_ltas_like_praat(voiced_full, self.loaded_audio_fs,
-                                                                    bandwidth=LTAS_BANDWIDTH)
-                    _, _, _, _, global_fcp, _ = compute_fcp_praat_style(freqs_full, ltas_full)
-                    self.fcp_mean_label.config(text=f"Global FCP = {global_fcp:.2f} dB")
-                else:
-                    self.fcp_mean_label.config(text="Global FCP = -- dB")
-
-                # Update LTAS display (first window)
-                freqs, ltas = compute_ltas_voiced_like_praat(self.loaded_audio_data[:win_samples], fs,
-                                                             bandwidth=LTAS_BANDWIDTH)
-                self.ax.clear()
-                self.ax.plot(freqs, ltas, color='black')
-                self.ax.set_xlim(0, 8000)
-                self.ax.set_ylim(0, 140)
-                self.fill_band_exact_2_4kHz(freqs, ltas, color)
-                self.ax.set_xlabel("Frequency (Hz)")
-                self.ax.set_ylabel("Relative intensity (dB)")
-                self.ax.set_title(f"LTAS (Loaded file: {self.loaded_audio_filename}, voiced only)", fontsize=16)
-                self.ax.legend()
-                self.canvas.draw()
-                self.play_button.config(state=tk.NORMAL)
-                self.export_button.config(state=tk.NORMAL)
-                messagebox.showinfo("Ready", "Audio loaded and processed. Ready to play!")
-                self.mode = 'idle'
+            self.play_button.config(state=tk.DISABLED)
+            messagebox.showerror("Error loading audio", f"Could not load audio file.\n\n{loader.error}")
+            return
 
-            else:
-                self.fcp_label.config(text="FCP = -- dB", fg='gray')
+        if self.precomputed_buffer:
+            if self.loaded_audio_data is None:
+                self._show_load_preview(loader)
+            # Global FCP: calculated on all voiced audio concatenated
+            if np.isnan(loader.global_fcp):
                 self.fcp_mean_label.config(text="Global FCP = -- dB")
-                self.play_button.config(state=tk.DISABLED)
-                self.export_button.config(state=tk.DISABLED)
-                messagebox.showwarning("No voiced data", "No voiced segments found in any window.")
+            else:
+                self.fcp_mean_label.config(text=f"Global FCP = {loader.global_fcp:.2f} dB")
+            self.export_button.config(state=tk.NORMAL)
+            if self.mode != 'playback':
+                messagebox.showinfo("Ready", "Audio loaded and processed. Ready to play!")
+                self.mode = 'idle'
 
-        except Exception as e:
-            messagebox.showerror("Error loading audio", f"Could not load audio file.\n\n{e}")
+        else:
+            self.fcp_label.config(text="FCP = -- dB", fg='gray')
+            self.fcp_mean_label.config(text="Global FCP = -- dB")
+            self.play_button.config(state=tk.DISABLED)
+            self.export_button.config(state=tk.DISABLED)
+            messagebox.showwarning("No voiced data", "No voiced segments found in any window.")
 
     def play_loaded_audio(self):
         if not hasattr(self, 'loaded_audio_data') or self.loaded_audio_data is None:
@@ -361,24 +387,19 @@ class FCPLiveGUI:
             messagebox.showwarning("Warning", "No precomputed analysis buffer found.")
             return
 
-        audio = self.loaded_audio_data.astype(np.float32)
-        fs = self.loaded_audio_fs
-        if fs != FS:
-            n_samples = int(len(audio) * FS / fs)
-            audio = resample(audio, n_samples)
-            fs = FS
-        if hasattr(audio, "ndim") and audio.ndim > 1:
-            audio = np.mean(audio, axis=1)
-        audio = audio / np.max(np.abs(audio) + 1e-6)
+        # load_wav_mono already returns mono audio; normalise once per loaded file
+        if self.playback_audio is None:
+            audio = np.asarray(self.loaded_audio_data, dtype=np.float32)  # no copy on the float32 path
+            self.playback_audio = audio / np.max(np.abs(audio) + 1e-6)
+        audio = self.playback_audio
 
         self.stop_playback = False
         self.mode = 'playback'
         self.stop_button.config(state=tk.NORMAL)
         self.live_button.config(state=tk.DISABLED)
 
-        win_samples = int(BUFFER_SECS * FS)
-        step_samples = int(UPDATE_INTERVAL * FS)
-        n_windows = len(self.precomputed_buffer)
+        fs = self.loaded_audio_fs
+        step_samples = int(UPDATE_INTERVAL * fs)
         playback_pointer = [0]
         audio_len = len(audio)
 
@@ -394,23 +415,18 @@ class FCPLiveGUI:
 
         def update_display():
             window_idx = int(playback_pointer[0] / step_samples)
-            if 0 <= window_idx < n_windows:
+            # precomputed_buffer may still be growing while the file is analysed in the background
+            if 0 <= window_idx < len(self.precomputed_buffer):
                 buf = self.precomputed_buffer[window_idx]
                 color = get_fcp_color(buf['FCP'])
                 self.fcp_label.config(text=f"FCP = {buf['FCP']:.2f} dB", fg=color)
 
-                # Dynamic LTAS update
-                self.ax.clear()
-                freqs, ltas = buf['freqs'], buf['ltas']
-                self.ax.plot(freqs, ltas, color='black')
-                self.ax.set_xlim(0, 8000)
-                self.ax.set_ylim(0, 140)
-                self.fill_band_exact_2_4kHz(freqs, ltas, color)
-                self.ax.set_xlabel("Frequency (Hz)")
-                self.ax.set_ylabel("Relative intensity (dB)")
-                self.ax.set_title(f"LTAS (Playback: {self.loaded_audio_filename})", fontsize=16)
-                self.ax.legend()
-                self.canvas.draw()
+                # Dynamic LTAS update (blitted)
+                self.ltas_plot.update(buf['freqs'], buf['ltas'], color,
+                                      title=f"LTAS (Playback: {self.loaded_audio_filename})")
+            elif self.file_loader is not None:
+                # Playback caught up with the background analysis
+                self.fcp_label.config(text="FCP = -- dB (analysing...)", fg="gray")
 
             if not self.stop_playback and playback_pointer[0] < audio_len:
                 self.root.after(int(UPDATE_INTERVAL * 1000), update_display)
@@ -419,10 +435,10 @@ class FCPLiveGUI:
 
         def run_playback():
             try:
-                with sd.OutputStream(samplerate=FS, channels=1, blocksize=2048, callback=audio_callback):
+                with sd.OutputStream(samplerate=fs, channels=1, blocksize=2048, callback=audio_callback):
                     # schedule UI updates
                     self.root.after(0, update_display)
-                    sd.sleep(int(len(audio) / FS * 1000))
+                    sd.sleep(int(len(audio) / fs * 1000))
             except Exception as e:
                 print("Playback stopped or error:", e)
             finally:
@@ -438,45 +454,21 @@ class FCPLiveGUI:
     def update_plot(self):
         if not self.running:
             return
-        freqs, ltas = compute_ltas_like_praat(self.audio_buffer, FS, bandwidth=LTAS_BANDWIDTH)
-        Lmax_0_2, Lmax_2_5, Lmax_5_8, Lmax_2_4, fcp, trend_at_fcp_peak = compute_fcp_praat_style(freqs, ltas)
-        color = get_fcp_color(fcp)
-        self.analysis_history.append({
-            "filename": "LIVE",
-            "Lmax_0_2": Lmax_0_2,
-            "Lmax_2_5": Lmax_2_5,
-            "Lmax_5_8": Lmax_5_8,
-            "Lmax_2_4": Lmax_2_4,
-            "FCP": fcp,
-            "Delta_0_2_2_5": Lmax_2_5 - Lmax_0_2,
-            "Delta_2_5_5_8": Lmax_5_8 - Lmax_2_5,
-            "Delta_0_2_5_8": Lmax_5_8 - Lmax_0_2,
-            "Delta_2_4": Lmax_2_4
-        })
-        self.ax.clear()
-        # Plot LTAS
-        self.ax.plot(freqs, ltas, color='black')
-        # Highlight the 2–4 kHz band
-        self.ax.set_xlim(0, 8000)
-        self.ax.set_ylim(0, 140)
-        self.fill_band_exact_2_4kHz(freqs, ltas, color)
-        self.ax.set_xlabel("Frequency (Hz)")
-        self.ax.set_ylabel("Relative intensity (dB)")
-        self.ax.set_title("Long-Term Average Spectrum", fontsize=16)
-        self.ax.legend()
-        # Update FCP label with color
-        if np.isnan(fcp):
-            self.fcp_label.config(text="FCP = -- dB", fg='gray')
-        else:
-            self.fcp_label.config(text=f"FCP = {fcp:.1f} dB", fg=color)
-
-        valid_fcps = [row["FCP"] for row in self.analysis_history if not np.isnan(row["FCP"])]
-        if valid_fcps:
-            mean_fcp = np.mean(valid_fcps)
-            self.fcp_mean_label.config(text=f"Mean FCP = {mean_fcp:.2f} dB")
-        else:
-            self.fcp_mean_label.config(text="Mean FCP = -- dB")
-        self.canvas.draw()
+        result = self.live_worker.latest() if self.live_worker is not None else None
+        if result is not None:
+            fcp = result["FCP"]
+            color = get_fcp_color(fcp)
+            # Plot LTAS with the 2–4 kHz band highlighted (only the changed artists are redrawn)
+            self.ltas_plot.update(result["freqs"], result["ltas"], color, title="Long-Term Average Spectrum")
+            # Update FCP label with color
+            if np.isnan(fcp):
+                self.fcp_label.config(text="FCP = -- dB", fg='gray')
+            else:
+                self.fcp_label.config(text=f"FCP = {fcp:.1f} dB", fg=color)
+            if np.isnan(result["mean_FCP"]):
+                self.fcp_mean_label.config(text="Mean FCP = -- dB")
+            else:
+                self.fcp_mean_label.config(text=f"Mean FCP = {result['mean_FCP']:.2f} dB")
         self.after_id = self.root.after(int(UPDATE_INTERVAL * 1000), self.update_plot)
 
     def stop_stream(self):
@@ -485,9 +477,16 @@ class FCPLiveGUI:
             self.stream.close()
             self.stream = None
 
+    def stop_worker(self):
+        if self.live_worker is not None:
+            self.live_worker.stop()
+            self.live_worker = None
+
     def on_exit(self):
         self.running = False
         self.stop_stream()
+        self.stop_worker()
+        self.stop_loader()
         if self.after_id:
             self.root.after_cancel(self.after_id)
         self.root.destroy()
@@ -534,7 +533,7 @@ class FCPLiveGUI:
         if not file_path:
             return
         try:
-            self.fig.savefig(file_path, dpi=300)
+            self.ltas_plot.savefig(file_path, dpi=300)
             messagebox.showinfo("Screenshot", f"Saved:\n{file_path}")
         except Exception as e:
             messagebox.showerror("Screenshot error", f"Could not save screenshot:\n{e}")
@@ -557,249 +556,80 @@ class FCPLiveGUI:
             return
 
         out_dir = self._ensure_exports_dir(prefix="Batch")
-        summary_rows = []
-        per_window_rows = []
+        self.batch_button.config(state=tk.DISABLED)
+        self.fcp_label.config(text=f"Batch: 0/{len(wav_paths)} files", fg="gray")
 
-        try:
-            for path in wav_paths:
-                file_name = os.path.basename(path)
-                file_stub = os.path.splitext(file_name)[0]
-                file_dir = os.path.join(out_dir, file_stub)
-                os.makedirs(file_dir, exist_ok=True)
-
-                try:
-                    fs0, data = wavfile.read(path)
-                    if data.ndim > 1:
-                        data = np.mean(data, axis=1)
-                    if fs0 != FS:
-                        n_samples = int(len(data) * FS / fs0)
-                        data = resample(data, n_samples)
-                        fs = FS
-                    else:
-                        fs = fs0
-                    data = data.astype(np.float64)
-
-                    # Global voiced-only LTAS & FCP
-                    freqs_full = None
-                    ltas_full = None
-                    voiced_full = extract_only_voiced_segments(data, fs)
-                    if len(voiced_full) >= int(0.2 * fs):
-                        freqs_full, ltas_full = compute_ltas_like_praat(voiced_full, fs, bandwidth=LTAS_BANDWIDTH)
-                        L0_2, L2_5, L5_8, L2_4, global_fcp, trend_at_peak = compute_fcp_praat_style(freqs_full, ltas_full)
-                    else:
-                        # Not enough voiced audio; mark as NaN
-                        L0_2 = L2_5 = L5_8 = L2_4 = global_fcp = trend_at_peak = np.nan
-
-                    # Sliding windows per-file
-                    win_samples = int(BUFFER_SECS * fs)
-                    step_samples = int(UPDATE_INTERVAL * fs)
-                    n = len(data)
-                    window_fcps = []
-                    file_window_rows = []  # keep a per-file copy for local plots
-                    for start in range(0, n - win_samples + 1, step_samples):
-                        buf = data[start:start + win_samples]
-                        freqs, ltas = compute_ltas_voiced_like_praat(buf, fs, bandwidth=LTAS_BANDWIDTH)
-                        if len(ltas) < 1 or np.isnan(ltas).all():
-                            continue
-                        Lw0_2, Lw2_5, Lw5_8, Lw2_4, fcp_w, _ = compute_fcp_praat_style(freqs, ltas)
-                        row = {
-                            "filename": file_name,
-                            "window_start_sec": start / fs,
-                            "window_end_sec": (start + win_samples) / fs,
-                            "Lmax_0_2": Lw0_2,
-                            "Lmax_2_5": Lw2_5,
-                            "Lmax_5_8": Lw5_8,
-                            "Lmax_2_4": Lw2_4,
-                            "FCP": fcp_w,
-                            "Delta_0_2_2_5": Lw2_5 - Lw0_2,
-                            "Delta_2_5_5_8": Lw5_8 - Lw2_5,
-                            "Delta_0_2_5_8": Lw5_8 - Lw0_2,
-                            "Delta_2_4": Lw2_4
-                        }
-                        per_window_rows.append(row)
-                        file_window_rows.append(row)
-                        window_fcps.append(fcp_w)
-
-                    # Summary stats per file (based on windows)
-                    mean_fcp = float(np.nanmean(window_fcps)) if window_fcps else np.nan
-                    sd_fcp = float(np.nanstd(window_fcps, ddof=1)) if len(window_fcps) > 1 else np.nan
-                    duration_sec = len(data) / fs
-
-                    summary_rows.append({
-                        "filename": file_name,
-                        "duration_sec": round(duration_sec, 3),
-                        "global_Lmax_0_2": L0_2,
-                        "global_Lmax_2_5": L2_5,
-                        "global_Lmax_5_8": L5_8,
-                        "global_Lmax_2_4": L2_4,
-                        "global_FCP": global_fcp,
-                        "global_Trend_at_FCP_Peak": trend_at_peak,
-                        "windows_mean_FCP": mean_fcp,
-                        "windows_sd_FCP": sd_fcp,
-                        "windows_count": len(window_fcps)
-                    })
-
-                    # --- NEW: per-file plots in its own folder ---
-                    # 1) FCP evolution over time (only if we have windows)
-                    if file_window_rows:
-                        self._save_fcp_evolution_plot(file_window_rows,
-                                                      source="precomputed",
-                                                      png_path=os.path.join(file_dir, "fcp_evolution.png"))
-
-                    # 2) Global voiced-only LTAS with band highlight (if available)
-                    if freqs_full is not None and ltas_full is not None and not np.isnan(global_fcp):
-                        band_color = get_fcp_color(global_fcp)
-                        title = f"LTAS (Global voiced-only) – {file_name}"
-                        self._save_ltas_plot_standalone(
-                            freqs_full, ltas_full, band_color, title,
-                            os.path.join(file_dir, "ltas_current.png"),
-                            fcp_value=global_fcp
-                        )
-
-                except Exception as file_err:
-                    summary_rows.append({
-                        "filename": file_name,
-                        "duration_sec": "NaN",
-                        "global_Lmax_0_2": "NaN",
-                        "global_Lmax_2_5": "NaN",
-                        "global_Lmax_5_8": "NaN",
-                        "global_Lmax_2_4": "NaN",
-                        "global_FCP": "NaN",
-                        "global_Trend_at_FCP_Peak": "NaN",
-                        "windows_mean_FCP": "NaN",
-                        "windows_sd_FCP": "NaN",
-                        "windows_count": 0,
-                        "error": str(file_err)
-                    })
-
-            # Write CSVs
-            summary_csv = os.path.join(out_dir, "batch_summary.csv")
-            windows_csv = os.path.join(out_dir, "batch_windows.csv")
-            self._write_rows_to_csv(summary_rows, summary_csv)
-            self._write_rows_to_csv(per_window_rows, windows_csv)
-
-            # Optional: write Excel if pandas is available
-            self._export_batch_excel_optional(summary_rows, per_window_rows, os.path.join(out_dir, "batch_results.xlsx"))
-
-            messagebox.showinfo("Batch", f"Batch analysis completed.\n\nFolder:\n{out_dir}\n\n"
-                                         f"- {os.path.basename(summary_csv)}\n"
-                                         f"- {os.path.basename(windows_csv)}\n"
-                                         f"+ Per-file images in subfolders")
+        def report_progress(done, total, file_name):
+            self.root.after(0, lambda: self.fcp_label.config(text=f"Batch: {done}/{total} files ({file_name})",
+                                                             fg="gray"))
 
-        except Exception as e:
-            messagebox.showerror("Batch error", f"Batch analysis failed:\n{e}")
+        def run_batch_job():
+            from fcp_batch import run_batch
+            # Files are spread over a process pool; this thread only waits, so the GUI stays responsive
+            try:
+                summary_rows, per_window_rows = run_batch(
+                    wav_paths, out_dir, workers=BATCH_WORKERS, progress=report_progress,
+                    fs_target=None if NATIVE_RATE else FS, window_secs=BUFFER_SECS, step_secs=UPDATE_INTERVAL,
+                    bandwidth=LTAS_BANDWIDTH, per_window_pitch=PER_WINDOW_PITCH, cache=self.analysis_cache,
+                    dtype=np.float32 if FLOAT32_ANALYSIS else np.float64)
+
+                # Write CSVs
+                summary_csv = os.path.join(out_dir, "batch_summary.csv")
+                windows_csv = os.path.join(out_dir, "batch_windows.csv")
+                self._write_rows_to_csv(summary_rows, summary_csv)
+                self._write_rows_to_csv(per_window_rows, windows_csv)
+
+                # Optional: write Excel if pandas is available
+                self._export_batch_excel_optional(summary_rows, per_window_rows,
+                                                  os.path.join(out_dir, "batch_results.xlsx"))
+
+                self.root.after(0, lambda: messagebox.showinfo(
+                    "Batch", f"Batch analysis completed.\n\nFolder:\n{out_dir}\n\n"
+                             f"- {os.path.basename(summary_csv)}\n"
+                             f"- {os.path.basename(windows_csv)}\n"
+                             f"+ Per-file images in subfolders"))
+
+            except Exception as e:
+                self.root.after(0, lambda e=e: messagebox.showerror("Batch error", f"Batch analysis failed:\n{e}"))
+            finally:
+                self.root.after(0, lambda: self.batch_button.config(state=tk.NORMAL))
+                self.root.after(0, lambda: self.fcp_label.config(text="FCP = -- dB", fg="gray"))
+
+        t = threading.Thread(target=run_batch_job)
+        t.daemon = True
+        t.start()
 
     # -------------------- Helpers for exports & plots --------------------
     def _ensure_exports_dir(self, prefix="Export"):
         """
         Create a timestamped directory under ./Exports/ and return its path.
         """
-        base = "Exports"
-        os.makedirs(base, exist_ok=True)
-        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-        out_dir = os.path.join(base, f"{prefix}_{ts}")
-        os.makedirs(out_dir, exist_ok=True)
-        return out_dir
+        return ensure_exports_dir(prefix)
 
     def _export_csv_to_path(self, export_data, save_path):
         """
-        Write export_data (list of dicts) to CSV including a final 'Global Mean' row
+        Write export_data (WindowResults) to CSV including a final 'Global Mean' row
         when numeric fields exist.
         """
-        fieldnames = [
-            "filename", "window_start_sec", "window_end_sec",
-            "Lmax_0_2", "Lmax_2_5", "Lmax_5_8", "Lmax_2_4",
-            "FCP", "Trend_at_FCP_Peak",
-            "Delta_0_2_2_5", "Delta_2_5_5_8",
-            "Delta_0_2_5_8", "Delta_2_4"
-        ]
-        with open(save_path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            # Only write allowed keys
-            for row in export_data:
-                row_filtered = {k: row[k] for k in fieldnames if k in row}
-                writer.writerow(row_filtered)
-            # Global means
-            global_means = {"filename": "Global Mean"}
-            numeric_fields = [
-                "Lmax_0_2", "Lmax_2_5", "Lmax_5_8", "Lmax_2_4",
-                "FCP", "Trend_at_FCP_Peak",
-                "Delta_0_2_2_5", "Delta_2_5_5_8",
-                "Delta_0_2_5_8", "Delta_2_4"
-            ]
-            for field in numeric_fields:
-                values = [row[field] for row in export_data if field in row and not np.isnan(row[field])]
-                global_means[field] = round(np.mean(values), 2) if values else "NaN"
-            writer.writerow(global_means)
+        export_windows_csv(export_data, save_path)
 
     def _write_rows_to_csv(self, rows, path):
         """
         Write arbitrary list[dict] rows to CSV with inferred headers.
         """
-        if not rows:
-            with open(path, 'w', newline='', encoding='utf-8') as f:
-                pass
-            return
-        # infer headers from union of keys preserving a reasonable order
-        keys = set()
-        for r in rows:
-            keys.update(r.keys())
-        ordered = ["filename"] + sorted(k for k in keys if k != "filename")
-        with open(path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=ordered)
-            writer.writeheader()
-            for r in rows:
-                writer.writerow({k: r.get(k, "") for k in ordered})
+        write_rows_csv(rows, path)
 
     def _export_excel_optional(self, export_data, xlsx_path):
         """
         Try to write export_data into an Excel file. If pandas is not available, silently skip.
         """
-        try:
-            import pandas as pd
-            # normalize list of dicts to DataFrame with the standard columns
-            fieldnames = [
-                "filename", "window_start_sec", "window_end_sec",
-                "Lmax_0_2", "Lmax_2_5", "Lmax_5_8", "Lmax_2_4",
-                "FCP", "Trend_at_FCP_Peak",
-                "Delta_0_2_2_5", "Delta_2_5_5_8",
-                "Delta_0_2_5_8", "Delta_2_4"
-            ]
-            df = pd.DataFrame([{k: row.get(k, np.nan) for k in fieldnames} for row in export_data])
-            # Global means row
-            numeric_fields = [
-                "Lmax_0_2", "Lmax_2_5", "Lmax_5_8", "Lmax_2_4",
-                "FCP", "Trend_at_FCP_Peak",
-                "Delta_0_2_2_5", "Delta_2_5_5_8",
-                "Delta_0_2_5_8", "Delta_2_4"
-            ]
-            if not df.empty:
-                means = {"filename": "Global Mean"}
-                for nf in numeric_fields:
-                    vals = pd.to_numeric(df[nf], errors='coerce')
-                    means[nf] = round(vals.mean(), 2)
-                df_means = pd.DataFrame([means])
-                with pd.ExcelWriter(xlsx_path, engine='xlsxwriter') as writer:
-                    df.to_excel(writer, index=False, sheet_name="data")
-                    df_means.to_excel(writer, index=False, sheet_name="summary")
-        except Exception:
-            # quietly skip if pandas/xlsxwriter is not available
-            pass
+        export_windows_excel(export_data, xlsx_path)
 
     def _export_batch_excel_optional(self, summary_rows, window_rows, xlsx_path):
         """
         Write batch results to Excel with two sheets if pandas is available.
         """
-        try:
-            import pandas as pd
-            df_summary = pd.DataFrame(summary_rows)
-            df_windows = pd.DataFrame(window_rows)
-            with pd.ExcelWriter(xlsx_path, engine='xlsxwriter') as writer:
-                df_summary.to_excel(writer, index=False, sheet_name="summary")
-                df_windows.to_excel(writer, index=False, sheet_name="windows")
-        except Exception:
-            pass
+        export_batch_excel(summary_rows, window_rows, xlsx_path)
 
     def _save_fcp_evolution_plot(self, data_rows, source, png_path):
         """
@@ -807,82 +637,15 @@ class FCPLiveGUI:
         - source='precomputed': use window_start_sec/window_end_sec
         - source='live': use sequential index * UPDATE_INTERVAL
         """
-        times = []
-        fcps = []
-        if source == "precomputed":
-            for r in data_rows:
-                if ("FCP" in r) and (not np.isnan(r["FCP"])):
-                    if "window_start_sec" in r and "window_end_sec" in r:
-                        t = 0.5 * (r["window_start_sec"] + r["window_end_sec"])
-                    else:
-                        t = np.nan
-                    times.append(t)
-                    fcps.append(r["FCP"])
-        else:  # live
-            for i, r in enumerate(data_rows):
-                if ("FCP" in r) and (not np.isnan(r["FCP"])):
-                    t = i * UPDATE_INTERVAL
-                    times.append(t)
-                    fcps.append(r["FCP"])
-
-        if not fcps:
-            return  # nothing to plot
-
-        fig = plt.figure(figsize=(8, 3.5))
-        ax = fig.add_subplot(111)
-        ax.plot(times, fcps, linewidth=2)
-        ax.set_xlabel("Time (s)")
-        ax.set_ylabel("FCP (dB)")
-        ax.set_title("FCP Evolution Over Time")
-        ax.grid(True, alpha=0.3)
-        fig.tight_layout()
-        fig.savefig(png_path, dpi=300)
-        plt.close(fig)
+        from fcp_plot import save_fcp_evolution_plot
+        save_fcp_evolution_plot(data_rows, source, png_path, update_interval=UPDATE_INTERVAL)
 
     def _save_ltas_plot_standalone(self, freqs, ltas, band_color, title, png_path, fcp_value=None):
         """
         Save a standalone LTAS plot with a highlighted 2–4 kHz band and given color.
         """
-        fig = plt.figure(figsize=(10, 5))
-        ax = fig.add_subplot(111)
-        ax.plot(freqs, ltas, color='black')
-        ax.set_xlim(0, 8000)
-        ax.set_ylim(0, 140)
-
-        # Fill 2–4 kHz band with interpolation for exact boundaries
-        band_start, band_end = 2000, 4000
-        mask = (freqs > band_start) & (freqs < band_end)
-        freq_interp = np.concatenate(([band_start], freqs[mask], [band_end]))
-        ltas_interp = np.concatenate((
-            [np.interp(band_start, freqs, ltas)],
-            ltas[mask],
-            [np.interp(band_end, freqs, ltas)]
-        ))
-        ax.fill_between(freq_interp, ltas_interp, y2=ax.get_ylim()[0],
-                        color=band_color, alpha=0.5, label="2–4 kHz band")
-
-        ax.set_xlabel("Frequency (Hz)")
-        ax.set_ylabel("Relative intensity (dB)")
-        ax.set_title(title, fontsize=16)
-        ax.legend()
-        fig.tight_layout()
-
-        # --- Overlay: Global FCP annotation (optional) ---
-        try:
-            if (fcp_value is not None) and (not np.isnan(fcp_value)):
-                ax.text(
-                    0.02, 0.95, f"Global FCP = {fcp_value:.2f} dB",
-                    transform=ax.transAxes, ha="left", va="top",
-                    fontsize=12, fontweight="bold",
-                    color=band_color,
-                    bbox=dict(boxstyle="round,pad=0.3", fc="white", ec=band_color, alpha=0.85)
-                )
-        except Exception:
-            # Stay silent if np is not available or value is NaN, etc.
-            pass
-
-        fig.savefig(png_path, dpi=300)
-        plt.close(fig)
+        from fcp_plot import save_ltas_plot_standalone
+        save_ltas_plot_standalone(freqs, ltas, band_color, title, png_path, fcp_value=fcp_value)
 
     # -------------------- ABOUT (existing) -------------------------------
     def show_about(self):
@@ -951,15 +714,19 @@ class FCPLiveGUI:
         ).pack(pady=(0, 18))
 
 if __name__ == "__main__":
-    def start_main_app():
+    import multiprocessing
+    multiprocessing.freeze_support()  # needed by the BATCH process pool in PyInstaller builds
+
+    def start_main_app(timings):
         root = tk.Tk()
         import tkinter.font as tkFont
         default_font = tkFont.nametofont("TkDefaultFont")
         default_font.configure(family="Calibri", size=11)
         app = FCPLiveGUI(root)
+        root.after_idle(print_startup_report, timings)
         try:
             root.mainloop()
         except KeyboardInterrupt:
             app.on_exit()
 
-    show_splash_screen(start_main_app)
+    show_splash_screen(start_main_app, STARTUP_TASKS)
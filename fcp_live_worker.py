@@ -0,0 +1,108 @@
+# fcp_live_worker.py
+
+import queue
+import threading
+import numpy as np
+from fcp_ltas import RollingLTAS, compute_fcp_praat_style
+from fcp_voicing import StreamingVoicingDetector
+
+class LiveAnalysisWorker(threading.Thread):
+    """
+    Background thread for LIVE mode: consumes audio from an AudioRingBuffer,
+    updates a RollingLTAS, computes the FCP and publishes a compact result
+    record every `interval` seconds.
+
+    Results go through a bounded queue (size 1 by default). When the GUI has
+    not picked up the previous result yet, it is dropped and replaced by the
+    newer one, so the GUI only ever renders the latest analysis. Every result
+    is still appended to `history` (a WindowResults or list; both appends are
+    thread-safe), so exports see the full session.
+
+    With voiced_only, the LTAS averages only the frames a StreamingVoicingDetector
+    marks as voiced (like the voiced-only analysis of loaded files), so silence
+    and breaths do not pull the FCP down. While the last window_secs hold no
+    voiced frame the result is still published, with NaN metrics and an empty
+    LTAS, so history keeps one row per interval.
+    """
+
+    def __init__(self, ring_buffer, fs, window_secs=1.0, bandwidth=350, interval=0.1,
+                 history=None, max_pending=1, voiced_only=True):
+        super().__init__(daemon=True)
+        self.ring_buffer = ring_buffer
+        self.interval = interval
+        self.history = history if history is not None else []
+        self.results = queue.Queue(maxsize=max_pending)
+        self.dropped = 0  # results replaced before the GUI read them
+        self._ltas = RollingLTAS(fs, window_secs, bandwidth=bandwidth,
+                                 voicing=StreamingVoicingDetector(fs) if voiced_only else None)
+        self._stop_event = threading.Event()
+        self._read_pos = ring_buffer.written
+        self._fcp_sum = 0.0
+        self._fcp_count = 0
+
+    def stop(self, timeout=1.0):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                result = self.analyse()
+            except Exception as e:
+                print("Live analysis error:", e)
+                continue
+            if result is not None:
+                self._publish(result)
+
+    def analyse(self):
+        """Consume new audio and return a result record (NaN metrics if no frame yet)."""
+        prev_pos = self._read_pos
+        new_audio, self._read_pos = self.ring_buffer.read_since(prev_pos)
+        if self._read_pos - prev_pos > len(new_audio):
+            self._ltas.reset()  # fell behind by more than the buffer: restart the average
+        self._ltas.push(new_audio)
+        freqs, ltas = self._ltas.ltas()
+        if len(ltas) < 1:
+            Lmax_0_2 = Lmax_2_5 = Lmax_5_8 = Lmax_2_4 = fcp = np.nan
+        else:
+            Lmax_0_2, Lmax_2_5, Lmax_5_8, Lmax_2_4, fcp, _ = compute_fcp_praat_style(freqs, ltas)
+        row = {
+            "filename": "LIVE",
+            "Lmax_0_2": Lmax_0_2,
+            "Lmax_2_5": Lmax_2_5,
+            "Lmax_5_8": Lmax_5_8,
+            "Lmax_2_4": Lmax_2_4,
+            "FCP": fcp,
+            "Delta_0_2_2_5": Lmax_2_5 - Lmax_0_2,
+            "Delta_2_5_5_8": Lmax_5_8 - Lmax_2_5,
+            "Delta_0_2_5_8": Lmax_5_8 - Lmax_0_2,
+            "Delta_2_4": Lmax_2_4
+        }
+        self.history.append(row)
+        if not np.isnan(fcp):
+            self._fcp_sum += fcp
+            self._fcp_count += 1
+        mean_fcp = self._fcp_sum / self._fcp_count if self._fcp_count else np.nan
+        return {"freqs": freqs, "ltas": ltas, "FCP": fcp, "mean_FCP": mean_fcp}
+
+    def _publish(self, result):
+        while True:
+            try:
+                self.results.put_nowait(result)
+                return
+            except queue.Full:
+                try:
+                    self.results.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def latest(self):
+        """Return the newest unread result, or None (called from the GUI thread)."""
+        result = None
+        while True:
+            try:
+                result = self.results.get_nowait()
+            except queue.Empty:
+                return result
@@ -1,70 +1,385 @@
-# fcp_ltas.py
-import numpy as np
-from scipy.signal import get_window
-
-def compute_ltas_like_praat(y, fs, bandwidth=350, win_len=0.04, hop_len=0.01):
-    """
-    Compute LTAS as average of dB spectra of short windows (like Praat).
-    y: audio array
-    fs: sample rate
-    bandwidth: bin width (Hz)
-    win_len: window length in seconds (default 40 ms)
-    hop_len: hop size in seconds (default 10 ms)
-    """
-    n_win = int(win_len * fs)
-    n_hop = int(hop_len * fs)
-    window = np.hanning(n_win)
-    frames_db = []
-    for start in range(0, len(y) - n_win + 1, n_hop):
-        segment = y[start:start + n_win] * window
-        spectrum = np.abs(np.fft.rfft(segment))
-        spectrum_db = 20 * np.log10(spectrum + 1e-12)
-        frames_db.append(spectrum_db)
-    if not frames_db:
-        return np.array([]), np.array([])
-    frames_db = np.stack(frames_db)
-    avg_db_spectrum = np.mean(frames_db, axis=0)
-    freqs = np.fft.rfftfreq(n_win, 1/fs)
-    bins = np.arange(0, freqs[-1] + bandwidth, bandwidth)
-    ltas = [np.max(avg_db_spectrum[(freqs >= bins[i]) & (freqs < bins[i+1])])
-            for i in range(len(bins) - 1)]
-    bin_centers = 0.5 * (bins[:-1] + bins[1:])
-    return bin_centers, np.array(ltas)
-
-
-
-def compute_fcp_praat_style(freqs, ltas):
-    # Bands
-    def band_max(f_lo, f_hi):
-        idx = np.where((freqs >= f_lo) & (freqs < f_hi))[0]
-        return np.max(ltas[idx]) if len(idx) else np.nan
-
-    Lmax_0_2 = band_max(0, 2000)
-    Lmax_2_5 = band_max(2000, 5000)
-    Lmax_5_8 = band_max(5000, 8000)
-    Lmax_2_4 = band_max(2000, 4000)
-
-    idx_1_5 = np.where((freqs >= 1000) & (freqs <= 5000))[0]
-    x_trend = freqs[idx_1_5]
-    y_trend = ltas[idx_1_5]
-    m, b = np.polyfit(x_trend, y_trend, 1)
-
-    # Trendline at LTAS points in 2–4 kHz
-    idx_2_4 = np.where((freqs >= 2000) & (freqs < 4000))[0]
-    x_peak = freqs[idx_2_4]
-    y_peak = ltas[idx_2_4]
-    peak_rel = np.argmax(y_peak)
-    f_peak = x_peak[peak_rel]
-    trend_at_peak = m * f_peak + b
-    fcp = y_peak[peak_rel] - trend_at_peak
-    return Lmax_0_2, Lmax_2_5, Lmax_5_8, Lmax_2_4, fcp, trend_at_peak
-
-def get_fcp_color(fcp):
-    if fcp < 5:
-        return '#1f77b4'  # blue
-    elif fcp < 10:
-        return '#2ca02c'  # green
-    elif fcp < 15:
-        return '#ff7f0e'  # orange
-    else:
-        return '#d62728'  # red
+# fcp_ltas.py
+import os
+import numpy as np
+from functools import lru_cache
+
+# Number of frames transformed per batched FFT call (bounds peak memory on long inputs)
+FRAME_BLOCK = 2048
+# FFT behind every frame spectrum (see set_fft_backend): "numpy" (np.fft) or
+# "scipy" (scipy.fft, each batch of frames split over FFT_WORKERS threads; -1 = all cores)
+FFT_BACKEND = os.environ.get("FCP_FFT_BACKEND", "numpy")
+FFT_WORKERS = int(os.environ.get("FCP_FFT_WORKERS", "1"))
+# Native-rate analysis (fcp_analysis with fs_target=None) expresses levels as at this rate
+REFERENCE_FS = 44100
+
+def frame_signal(y, n_win, n_hop):
+    """
+    Return a zero-copy (n_frames, n_win) strided view of y with hop n_hop.
+    Frames start at 0, n_hop, 2*n_hop, ... and never run past the end of y.
+    """
+    y = np.asarray(y)
+    if n_win <= 0 or n_hop <= 0 or len(y) < n_win:
+        return np.empty((0, max(n_win, 0)), dtype=y.dtype)
+    return np.lib.stride_tricks.sliding_window_view(y, n_win)[::n_hop]
+
+def set_fft_backend(backend="numpy", workers=1):
+    """
+    Select the FFT of frame_spectra_db (and so of every LTAS): "numpy" or
+    "scipy" with `workers` threads per batch of frames (-1 = all cores).
+    The choice is also put in the environment (FCP_FFT_BACKEND / FCP_FFT_WORKERS)
+    so worker processes started afterwards (fcp_batch.run_batch) use it too.
+    """
+    global FFT_BACKEND, FFT_WORKERS
+    if backend not in ("numpy", "scipy"):
+        raise ValueError(f"Unknown FFT backend {backend!r} (use 'numpy' or 'scipy')")
+    FFT_BACKEND, FFT_WORKERS = backend, int(workers)
+    os.environ["FCP_FFT_BACKEND"] = backend
+    os.environ["FCP_FFT_WORKERS"] = str(FFT_WORKERS)
+
+def rfft_frames(x):
+    """Real FFT of each row of x with the selected backend (float32 rows stay single precision)."""
+    if FFT_BACKEND == "scipy":
+        import scipy.fft
+        return scipy.fft.rfft(x, axis=1, workers=FFT_WORKERS)
+    return np.fft.rfft(x, axis=1)
+
+def frame_spectra_db(frames, window):
+    """
+    Windowed magnitude spectra (dB) of a frame matrix with one batched real FFT.
+    frames: (n_frames, n_win) array (e.g. from frame_signal); float32 frames
+            are windowed, transformed and converted to dB in float32
+    window: analysis window of length n_win
+    """
+    if frames.dtype == np.float32:
+        window = window.astype(np.float32)
+    spectrum = np.abs(rfft_frames(frames * window))
+    return 20 * np.log10(spectrum + 1e-12)
+
+@lru_cache(maxsize=64)
+def ltas_band_table(n_fft, fs, bandwidth):
+    """
+    Bin-index table for reducing an rfft spectrum to fixed-width LTAS bands.
+    Cached per (n_fft, fs, bandwidth) so it is built once per configuration.
+    Returns (bin_centers, starts, empty, stop):
+      starts: first spectrum index of each band (clipped, for np.maximum.reduceat)
+      empty:  bands that contain no spectrum bin
+      stop:   spectrum bins at or above this index fall outside every band
+    """
+    freqs = np.fft.rfftfreq(n_fft, 1/fs)
+    bins = np.arange(0, freqs[-1] + bandwidth, bandwidth)
+    edges = np.searchsorted(freqs, bins, side='left')
+    empty = edges[:-1] == edges[1:]
+    stop = int(edges[-1])
+    starts = np.minimum(edges[:-1], max(stop - 1, 0))
+    bin_centers = 0.5 * (bins[:-1] + bins[1:])
+    for arr in (bin_centers, starts, empty):
+        arr.setflags(write=False)
+    return bin_centers, starts, empty, stop
+
+def band_max_db(spectrum_db, n_fft, fs, bandwidth):
+    """
+    Reduce an averaged dB spectrum (length n_fft // 2 + 1) to the max of each
+    bandwidth-wide band. Returns (bin_centers, ltas); empty bands are NaN.
+    Levels are left as computed at fs, as in fcp_reference (see rate_level_offset).
+    """
+    bin_centers, starts, empty, stop = ltas_band_table(n_fft, fs, bandwidth)
+    if stop == 0:
+        return bin_centers, np.full(len(bin_centers), np.nan)
+    ltas = np.maximum.reduceat(spectrum_db[:stop], starts)
+    if empty.any():
+        ltas = ltas.astype(float)
+        ltas[empty] = np.nan
+    return bin_centers, ltas
+
+def rate_level_offset(fs, reference_fs=REFERENCE_FS):
+    """
+    dB to add to LTAS levels computed at fs to express them as at reference_fs,
+    20*log10(reference_fs / fs). The unnormalised rfft magnitude of a tone grows
+    with the frame length in samples (with fs for a 40 ms frame); that of
+    broadband noise only with its square root, so the shift is exact for the
+    harmonics of a voice and approximate for noise.
+    """
+    return 0.0 if fs == reference_fs else 20 * np.log10(reference_fs / fs)
+
+def compute_ltas_like_praat(y, fs, bandwidth=350, win_len=0.04, hop_len=0.01):
+    """
+    Compute LTAS as average of dB spectra of short windows (like Praat).
+    y: audio array
+    fs: sample rate
+    bandwidth: bin width (Hz)
+    win_len: window length in seconds (default 40 ms)
+    hop_len: hop size in seconds (default 10 ms)
+    """
+    n_win = int(win_len * fs)
+    n_hop = int(hop_len * fs)
+    window = np.hanning(n_win)
+    frames = frame_signal(y, n_win, n_hop)
+    n_frames = len(frames)
+    if n_frames == 0:
+        return np.array([]), np.array([])
+    sum_db = np.zeros(n_win // 2 + 1)
+    add_spectra_db(sum_db, frames, window)
+    avg_db_spectrum = sum_db / n_frames
+    return band_max_db(avg_db_spectrum, n_win, fs, bandwidth)
+
+def add_spectra_db(sum_db, frames, window):
+    """
+    Add the dB spectra of all frames to sum_db, with batched FFTs over blocks
+    of FRAME_BLOCK frames so memory stays bounded.
+    """
+    for i in range(0, len(frames), FRAME_BLOCK):
+        sum_db += frame_spectra_db(frames[i:i + FRAME_BLOCK], window).sum(axis=0, dtype=np.float64)
+
+def compute_ltas_over_intervals(y, fs, starts, ends, bandwidth=350, win_len=0.04, hop_len=0.01,
+                                straddle=True):
+    """
+    LTAS of the intervals y[starts[i]:ends[i]] taken together, without
+    concatenating them (the frames are strided views into y).
+    straddle=True gives compute_ltas_like_praat of the concatenated intervals
+    (up to float summation order): frames run on the concatenation's 10 ms grid,
+    and the few frames that cross a join are gathered from both sides.
+    straddle=False keeps only frames that lie inside one interval; each
+    interval is then framed from its own start, as a signal of its own.
+    Returns (bin_centers, ltas), empty when there is no complete frame.
+    """
+    n_win = int(win_len * fs)
+    n_hop = int(hop_len * fs)
+    starts = np.clip(np.asarray(starts, dtype=int), 0, len(y))
+    ends = np.clip(np.asarray(ends, dtype=int), 0, len(y))
+    keep = ends > starts
+    starts, ends = starts[keep], ends[keep]
+    window = np.hanning(n_win)
+    sum_db = np.zeros(n_win // 2 + 1)
+    n_frames = 0
+
+    if not straddle:
+        for a, b in zip(starts, ends):
+            frames = frame_signal(y[a:b], n_win, n_hop)
+            add_spectra_db(sum_db, frames, window)
+            n_frames += len(frames)
+    else:
+        # Position of each interval in the (virtual) concatenation
+        virtual = np.concatenate(([0], np.cumsum(ends - starts)))
+        for i, (a, b) in enumerate(zip(starts, ends)):
+            # Frames of the concatenation's grid that lie inside this interval
+            offset = -virtual[i] % n_hop
+            frames = frame_signal(y[a + offset:b], n_win, n_hop)
+            add_spectra_db(sum_db, frames, window)
+            n_frames += len(frames)
+        # Frames crossing a join start less than n_win before it
+        total = virtual[-1]
+        joins = virtual[1:-1]
+        first = np.maximum((joins - n_win) // n_hop + 1, 0)
+        last = np.minimum((joins - 1) // n_hop, (total - n_win) // n_hop)
+        crossing = np.unique(np.concatenate([np.arange(f, l + 1) for f, l in zip(first, last) if f <= l]
+                                            or [np.zeros(0, dtype=int)])) * n_hop
+        for i in range(0, len(crossing), FRAME_BLOCK):
+            pos = crossing[i:i + FRAME_BLOCK, None] + np.arange(n_win)
+            seg = np.searchsorted(virtual, pos, side='right') - 1
+            add_spectra_db(sum_db, y[starts[seg] + pos - virtual[seg]], window)
+            n_frames += len(pos)
+
+    if n_frames == 0:
+        return np.array([]), np.array([])
+    return band_max_db(sum_db / n_frames, n_win, fs, bandwidth)
+
+class LTASAccumulator:
+    """
+    compute_ltas_like_praat for a signal that arrives in pieces: push() the
+    pieces in order (they are framed as one continuous signal, exactly as if
+    they had been concatenated) and call ltas() at the end. Only the running
+    dB sum and a partial frame are kept, so memory does not grow with length.
+    dtype: sample type the pieces are framed in (np.float32 for the float32 path).
+    """
+
+    def __init__(self, fs, bandwidth=350, win_len=0.04, hop_len=0.01, dtype=np.float64):
+        self.fs = fs
+        self.bandwidth = bandwidth
+        self.n_win = int(win_len * fs)
+        self.n_hop = int(hop_len * fs)
+        self.window = np.hanning(self.n_win)
+        self.n_samples = 0  # total samples pushed
+        self.n_frames = 0
+        self._sum = np.zeros(self.n_win // 2 + 1)
+        self._pending = np.zeros(0, dtype=dtype)  # samples from the next frame start onwards
+
+    def push(self, samples):
+        buf = np.concatenate((self._pending, samples.astype(self._pending.dtype, copy=False)))
+        frames = frame_signal(buf, self.n_win, self.n_hop)
+        add_spectra_db(self._sum, frames, self.window)
+        self.n_frames += len(frames)
+        self.n_samples += len(samples)
+        self._pending = buf[len(frames) * self.n_hop:]
+
+    def ltas(self):
+        """Return (bin_centers, ltas) over everything pushed, or empty arrays."""
+        if self.n_frames == 0:
+            return np.array([]), np.array([])
+        return band_max_db(self._sum / self.n_frames, self.n_win, self.fs, self.bandwidth)
+
+class RollingLTAS:
+    """
+    Incremental LTAS over the most recent window_secs of a live stream.
+    push() only transforms the frames completed by the newly arrived samples;
+    their dB spectra go into a ring of per-frame spectra and a running sum, so
+    ltas() is the same average compute_ltas_like_praat would give on the last
+    window_secs of audio (frames on the stream's own 10 ms grid).
+    voicing: optional per-frame detector (fcp_voicing.StreamingVoicingDetector);
+             only frames it marks as voiced are averaged, like
+             compute_ltas_voiced_like_praat over the last window_secs.
+    """
+
+    # Re-sum the ring every N pushes to bound float drift of the running sum
+    RESYNC_PUSHES = 256
+
+    def __init__(self, fs, window_secs=1.0, bandwidth=350, win_len=0.04, hop_len=0.01, voicing=None):
+        self.fs = fs
+        self.bandwidth = bandwidth
+        self.voicing = voicing
+        self.n_win = int(win_len * fs)
+        self.n_hop = int(hop_len * fs)
+        self.window = np.hanning(self.n_win)
+        self.frames_per_window = max((int(window_secs * fs) - self.n_win) // self.n_hop + 1, 1)
+        self._spectra = np.zeros((self.frames_per_window, self.n_win // 2 + 1))
+        self._voiced = np.zeros(self.frames_per_window, dtype=bool)  # unvoiced slots hold zeros
+        self.reset()
+
+    def reset(self):
+        self._spectra[:] = 0
+        self._voiced[:] = False
+        self._sum = np.zeros(self._spectra.shape[1])
+        self._count = 0  # frames currently in the ring
+        self._n_voiced = 0  # voiced frames currently in the ring
+        self._slot = 0  # ring slot of the next frame
+        self._pushes = 0
+        self._pending = np.zeros(0)  # samples from the next frame start onwards
+        if self.voicing is not None:
+            self.voicing.reset()
+
+    def push(self, samples):
+        """Feed newly captured samples (1-D); returns the number of new frames."""
+        buf = np.concatenate((self._pending, samples))
+        frames = frame_signal(buf, self.n_win, self.n_hop)
+        n_new = len(frames)
+        self._pending = buf[n_new * self.n_hop:]
+        if n_new == 0:
+            return 0
+        k = self.frames_per_window
+        if n_new > k:
+            frames = frames[-k:]
+        if self.voicing is None:
+            voiced = np.ones(len(frames), dtype=bool)
+            new_db = frame_spectra_db(frames, self.window)
+        else:
+            # Only voiced frames are transformed; unvoiced ones enter the ring as zeros
+            voiced = self.voicing.voiced(frames)
+            new_db = np.zeros((len(frames), self._spectra.shape[1]))
+            if voiced.any():
+                new_db[voiced] = frame_spectra_db(frames[voiced], self.window)
+        m = len(new_db)
+        slots = (self._slot + np.arange(m)) % k
+        # Slots already holding a frame are overwritten: drop them from the sum
+        n_free = k - self._count
+        self._sum -= self._spectra[slots[n_free:]].sum(axis=0)
+        self._n_voiced -= int(self._voiced[slots[n_free:]].sum())
+        self._spectra[slots] = new_db
+        self._voiced[slots] = voiced
+        self._sum += new_db.sum(axis=0)
+        self._n_voiced += int(voiced.sum())
+        self._count = min(self._count + m, k)
+        self._slot = (self._slot + m) % k
+        self._pushes += 1
+        if self._pushes % self.RESYNC_PUSHES == 0:
+            self._sum = self._spectra.sum(axis=0)  # unfilled slots are zero
+        return n_new
+
+    def ltas(self):
+        """Return (bin_centers, ltas) of the current window, or empty arrays (no voiced frame)."""
+        if self._n_voiced == 0:
+            return np.array([]), np.array([])
+        return band_max_db(self._sum / self._n_voiced, self.n_win, self.fs, self.bandwidth)
+
+
+def compute_fcp_praat_style(freqs, ltas):
+    # Bands
+    def band_max(f_lo, f_hi):
+        idx = np.where((freqs >= f_lo) & (freqs < f_hi))[0]
+        return np.max(ltas[idx]) if len(idx) else np.nan
+
+    Lmax_0_2 = band_max(0, 2000)
+    Lmax_2_5 = band_max(2000, 5000)
+    Lmax_5_8 = band_max(5000, 8000)
+    Lmax_2_4 = band_max(2000, 4000)
+
+    idx_1_5 = np.where((freqs >= 1000) & (freqs <= 5000))[0]
+    x_trend = freqs[idx_1_5]
+    y_trend = ltas[idx_1_5]
+    m, b = np.polyfit(x_trend, y_trend, 1)
+
+    # Trendline at LTAS points in 2–4 kHz
+    idx_2_4 = np.where((freqs >= 2000) & (freqs < 4000))[0]
+    x_peak = freqs[idx_2_4]
+    y_peak = ltas[idx_2_4]
+    peak_rel = np.argmax(y_peak)
+    f_peak = x_peak[peak_rel]
+    trend_at_peak = m * f_peak + b
+    fcp = y_peak[peak_rel] - trend_at_peak
+    return Lmax_0_2, Lmax_2_5, Lmax_5_8, Lmax_2_4, fcp, trend_at_peak
+
+def fcp_band_table(freqs):
+    """
+    Band indices and least-squares weights of compute_fcp_praat_style for one
+    frequency axis, shared by every LTAS on that axis (see compute_fcp_batch).
+    Returns (bands, idx_2_4, trend_idx, slope_weights, x_mean):
+      bands:      index arrays of the 0-2, 2-5, 5-8 and 2-4 kHz bands
+      idx_2_4:    the 2-4 kHz band, where the FCP peak is searched
+      trend_idx:  the 1-5 kHz points of the trend line
+      slope_weights, x_mean: slope = ltas[trend_idx] @ slope_weights and
+                  intercept = mean(ltas[trend_idx]) - slope * x_mean
+                  (the closed-form degree-1 fit)
+    """
+    freqs = np.asarray(freqs, dtype=float)
+    bands = [np.flatnonzero((freqs >= f_lo) & (freqs < f_hi))
+             for f_lo, f_hi in ((0, 2000), (2000, 5000), (5000, 8000), (2000, 4000))]
+    trend_idx = np.flatnonzero((freqs >= 1000) & (freqs <= 5000))
+    x = freqs[trend_idx]
+    x_mean = x.mean() if len(x) else np.nan
+    dx = x - x_mean
+    sxx = dx @ dx
+    slope_weights = dx / sxx if sxx > 0 else np.full(len(x), np.nan)
+    return bands, bands[3], trend_idx, slope_weights, x_mean
+
+def compute_fcp_batch(freqs, ltas):
+    """
+    compute_fcp_praat_style for many LTAS curves on one frequency axis at once.
+    ltas: (n_windows, n_bands) matrix (e.g. WindowResults.ltas).
+    Returns arrays (Lmax_0_2, Lmax_2_5, Lmax_5_8, Lmax_2_4, FCP, trend_at_peak),
+    one value per row, equal to the per-curve results up to float rounding
+    (the trend line is the closed-form least-squares fit instead of np.polyfit).
+    A NaN inside a band or the 1-5 kHz fit range gives NaN, as np.max does.
+    """
+    ltas = np.atleast_2d(np.asarray(ltas, dtype=float))
+    n = len(ltas)
+    bands, idx_2_4, trend_idx, slope_weights, x_mean = fcp_band_table(freqs)
+    Lmax = [ltas[:, idx].max(axis=1) if len(idx) else np.full(n, np.nan) for idx in bands]
+    if len(idx_2_4) == 0 or len(trend_idx) < 2:
+        return (*Lmax, np.full(n, np.nan), np.full(n, np.nan))
+    y_trend = ltas[:, trend_idx]
+    slope = y_trend @ slope_weights
+    intercept = y_trend.mean(axis=1) - slope * x_mean
+    y_peak = ltas[:, idx_2_4]
+    peak_rel = np.argmax(y_peak, axis=1)
+    f_peak = np.asarray(freqs, dtype=float)[idx_2_4][peak_rel]
+    trend_at_peak = slope * f_peak + intercept
+    fcp = y_peak[np.arange(n), peak_rel] - trend_at_peak
+    return (*Lmax, fcp, trend_at_peak)
+
+def get_fcp_color(fcp):
+    if fcp < 5:
+        return '#1f77b4'  # blue
+    elif fcp < 10:
+        return '#2ca02c'  # green
+    elif fcp < 15:
+        return '#ff7f0e'  # orange
+    else:
+        return '#d62728'  # red
@@ -0,0 +1,177 @@
+# fcp_plot.py
+
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.patches import Polygon
+
+def band_polygon_2_4kHz(freqs, ltas, y_floor, band_start=2000, band_end=4000):
+    """
+    Vertices of the 2–4 kHz band under the LTAS curve, using linear
+    interpolation at the exact band boundaries (same shape as fill_between).
+    """
+    mask = (freqs > band_start) & (freqs < band_end)
+    x = np.concatenate(([band_start], freqs[mask], [band_end]))
+    y = np.concatenate((
+        [np.interp(band_start, freqs, ltas)],
+        ltas[mask],
+        [np.interp(band_end, freqs, ltas)]
+    ))
+    top = np.column_stack((x, y))
+    bottom = np.array([[band_end, y_floor], [band_start, y_floor]])
+    return np.vstack((top, bottom))
+
+class LTASPlotRenderer:
+    """
+    Persistent LTAS plot for the live and playback displays.
+
+    The axes, labels and legend are drawn once; the LTAS line, the 2–4 kHz
+    band polygon and the legend are animated artists. Each update() only
+    changes their data/colour, restores the cached background and blits the
+    axes, instead of ax.clear() + a full canvas.draw() per tick. The
+    background is re-cached on every full draw (resize, title change).
+    """
+
+    def __init__(self, fig, ax, canvas, xlim=(0, 8000), ylim=(0, 140)):
+        self.fig = fig
+        self.ax = ax
+        self.canvas = canvas
+        self._background = None
+        ax.clear()
+        ax.set_xlim(*xlim)
+        ax.set_ylim(*ylim)
+        ax.set_xlabel("Frequency (Hz)")
+        ax.set_ylabel("Relative intensity (dB)")
+        self.title = ax.set_title("", fontsize=16)
+        self.band = Polygon(np.zeros((0, 2)), closed=True, alpha=0.5, label="2-4kHz band",
+                            visible=False, animated=True)
+        ax.add_patch(self.band)
+        (self.line,) = ax.plot([], [], color='black', visible=False, animated=True)
+        self.legend = ax.legend(handles=[self.band])
+        self.legend.set_animated(True)
+        self.legend.set_visible(False)
+        handles = getattr(self.legend, "legend_handles", None) or self.legend.legendHandles
+        self._legend_patch = handles[0]
+        self._legend_patch.set_visible(True)  # copied from the (hidden) band
+        self._draw_cid = canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        self.ax.draw_artist(self.band)
+        self.ax.draw_artist(self.line)
+        self.ax.draw_artist(self.legend)
+
+    def update(self, freqs, ltas, color, title=None):
+        """Show a new LTAS curve with the band filled in `color`."""
+        if title is not None and title != self.title.get_text():
+            self.title.set_text(title)
+            self._background = None  # static part changed: needs a full draw
+        if len(ltas) < 1:
+            self.clear_curve()
+            return
+        self.line.set_data(freqs, ltas)
+        self.band.set_xy(band_polygon_2_4kHz(freqs, ltas, self.ax.get_ylim()[0]))
+        self.band.set_facecolor(color)
+        self._legend_patch.set_facecolor(color)
+        for artist in (self.line, self.band, self.legend):
+            artist.set_visible(True)
+        self.blit()
+
+    def clear_curve(self):
+        for artist in (self.line, self.band, self.legend):
+            artist.set_visible(False)
+        self.blit()
+
+    def blit(self):
+        if self._background is None:
+            self.canvas.draw()  # _on_draw caches the background and draws the curve
+        else:
+            self.canvas.restore_region(self._background)
+            self._draw_animated()
+            self.canvas.blit(self.ax.bbox)
+
+    def savefig(self, path, **kwargs):
+        """Save the figure including the animated artists."""
+        artists = (self.line, self.band, self.legend)
+        for artist in artists:
+            artist.set_animated(False)
+        try:
+            self.fig.savefig(path, **kwargs)
+        finally:
+            for artist in artists:
+                artist.set_animated(True)
+            self._background = None
+            self.blit()
+
+
+def save_fcp_evolution_plot(data_rows, source, png_path, update_interval=0.1):
+    """
+    Save a PNG plotting FCP over time.
+    - source='precomputed': use window_start_sec/window_end_sec
+    - source='live': use sequential index * update_interval
+    Uses a standalone Figure (no pyplot state), so it is safe in worker processes.
+    """
+    times = []
+    fcps = []
+    if source == "precomputed":
+        for r in data_rows:
+            if ("FCP" in r) and (not np.isnan(r["FCP"])):
+                if "window_start_sec" in r and "window_end_sec" in r:
+                    t = 0.5 * (r["window_start_sec"] + r["window_end_sec"])
+                else:
+                    t = np.nan
+                times.append(t)
+                fcps.append(r["FCP"])
+    else:  # live
+        for i, r in enumerate(data_rows):
+            if ("FCP" in r) and (not np.isnan(r["FCP"])):
+                t = i * update_interval
+                times.append(t)
+                fcps.append(r["FCP"])
+
+    if not fcps:
+        return  # nothing to plot
+
+    fig = Figure(figsize=(8, 3.5))
+    ax = fig.add_subplot(111)
+    ax.plot(times, fcps, linewidth=2)
+    ax.set_xlabel("Time (s)")
+    ax.set_ylabel("FCP (dB)")
+    ax.set_title("FCP Evolution Over Time")
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    fig.savefig(png_path, dpi=300)
+
+def save_ltas_plot_standalone(freqs, ltas, band_color, title, png_path, fcp_value=None):
+    """
+    Save a standalone LTAS plot with a highlighted 2–4 kHz band and given color.
+    """
+    fig = Figure(figsize=(10, 5))
+    ax = fig.add_subplot(111)
+    ax.plot(freqs, ltas, color='black')
+    ax.set_xlim(0, 8000)
+    ax.set_ylim(0, 140)
+
+    # Fill 2–4 kHz band with interpolation for exact boundaries
+    ax.add_patch(Polygon(band_polygon_2_4kHz(freqs, ltas, ax.get_ylim()[0]), closed=True,
+                         color=band_color, alpha=0.5, label="2–4 kHz band"))
+
+    ax.set_xlabel("Frequency (Hz)")
+    ax.set_ylabel("Relative intensity (dB)")
+    ax.set_title(title, fontsize=16)
+    ax.legend()
+    fig.tight_layout()
+
+    # --- Overlay: Global FCP annotation (optional) ---
+    if (fcp_value is not None) and (not np.isnan(fcp_value)):
+        ax.text(
+            0.02, 0.95, f"Global FCP = {fcp_value:.2f} dB",
+            transform=ax.transAxes, ha="left", va="top",
+            fontsize=12, fontweight="bold",
+            color=band_color,
+            bbox=dict(boxstyle="round,pad=0.3", fc="white", ec=band_color, alpha=0.85)
+        )
+
+    fig.savefig(png_path, dpi=300)
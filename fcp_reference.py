@@ -0,0 +1,160 @@
+# fcp_reference.py
+# Reference (loop-based) implementations of the Praat-style LTAS/FCP analysis,
+# as originally written. They are slow and are not used by the application;
+# fcp_equivalence.py checks the optimized functions against them.
+# Do not optimize these: they define the published values.
+
+import numpy as np
+import parselmouth
+
+def get_pitch_track(y, fs, time_step=0.01):
+    """Praat pitch tracking: (pitch_times, pitch_values), 0 where unvoiced."""
+    snd = parselmouth.Sound(y, fs)
+    pitch = snd.to_pitch(time_step=time_step)
+    return pitch.xs(), pitch.selected_array['frequency']
+
+def compute_ltas_like_praat(y, fs, bandwidth=350, win_len=0.04, hop_len=0.01):
+    """
+    Compute LTAS as average of dB spectra of short windows (like Praat).
+    One FFT per frame in a Python loop.
+    """
+    n_win = int(win_len * fs)
+    n_hop = int(hop_len * fs)
+    window = np.hanning(n_win)
+    frames_db = []
+    for start in range(0, len(y) - n_win + 1, n_hop):
+        segment = y[start:start + n_win] * window
+        spectrum = np.abs(np.fft.rfft(segment))
+        spectrum_db = 20 * np.log10(spectrum + 1e-12)
+        frames_db.append(spectrum_db)
+    if not frames_db:
+        return np.array([]), np.array([])
+    frames_db = np.stack(frames_db)
+    avg_db_spectrum = np.mean(frames_db, axis=0)
+    freqs = np.fft.rfftfreq(n_win, 1/fs)
+    bins = np.arange(0, freqs[-1] + bandwidth, bandwidth)
+    ltas = [np.max(avg_db_spectrum[(freqs >= bins[i]) & (freqs < bins[i+1])])
+            for i in range(len(bins) - 1)]
+    bin_centers = 0.5 * (bins[:-1] + bins[1:])
+    return bin_centers, np.array(ltas)
+
+def get_voiced_mask(y, fs, pitch_track=None):
+    """Per-sample voicing mask: +-5 ms around each voiced pitch frame, dilated 10 samples."""
+    if pitch_track is None:
+        pitch_track = get_pitch_track(y, fs)
+    pitch_times, pitch_values = pitch_track
+    mask = np.zeros(len(y), dtype=bool)
+    for i, t in enumerate(pitch_times):
+        idx = int(t * fs)
+        if idx < len(mask) and pitch_values[i] > 0:
+            # Marks 10 ms around the center as voiced
+            win = int(0.01 * fs // 2)
+            mask[max(0, idx-win):min(len(mask), idx+win)] = True
+    # Dilate the mask to avoid abrupt cuts
+    from scipy.ndimage import binary_dilation
+    mask = binary_dilation(mask, iterations=10)
+    return mask
+
+def compute_ltas_voiced_like_praat(y, fs, bandwidth=350, mask=None):
+    """LTAS over the frames of y that are at least half voiced (one FFT per frame)."""
+    if mask is None:
+        mask = get_voiced_mask(y, fs)
+    win_len = int(0.04 * fs)
+    hop_len = int(0.01 * fs)
+    frames = []
+    for start in range(0, len(y) - win_len + 1, hop_len):
+        seg = y[start:start + win_len]
+        msk = mask[start:start + win_len]
+        if np.mean(msk) < 0.5:
+            continue  # Only include truly voiced windows!
+        segment = seg * np.hanning(win_len)
+        spectrum = np.abs(np.fft.rfft(segment))
+        spectrum_db = 20 * np.log10(spectrum + 1e-12)
+        frames.append(spectrum_db)
+    if not frames:
+        return np.array([]), np.array([])
+    frames = np.stack(frames)
+    avg_spectrum = np.mean(frames, axis=0)
+    freqs = np.fft.rfftfreq(win_len, 1/fs)
+    bins = np.arange(0, freqs[-1] + bandwidth, bandwidth)
+    ltas = [np.max(avg_spectrum[(freqs >= bins[i]) & (freqs < bins[i+1])]) for i in range(len(bins) - 1)]
+    bin_centers = 0.5 * (bins[:-1] + bins[1:])
+    return bin_centers, np.array(ltas)
+
+def extract_only_voiced_segments(y, fs, pitch_track=None):
+    """Concatenation of the voiced segments of y that last at least 50 ms."""
+    if pitch_track is None:
+        pitch_track = get_pitch_track(y, fs)
+    pitch_times, pitch_values = pitch_track
+    voiced = pitch_values > 0
+
+    # Find starts and ends of voiced segments
+    segments = []
+    start_time = None
+    for i, v in enumerate(voiced):
+        t = pitch_times[i]
+        if v:
+            if start_time is None:
+                start_time = t
+        else:
+            if start_time is not None:
+                if t - start_time >= 0.05:  # only take segments longer than 50 ms
+                    segments.append((start_time, t))
+                start_time = None
+    if start_time is not None and pitch_times[-1] - start_time >= 0.05:
+        segments.append((start_time, pitch_times[-1]))
+
+    voiced_audio = []
+    for t0, t1 in segments:
+        i0 = int(t0 * fs)
+        i1 = int(t1 * fs)
+        voiced_audio.append(y[i0:i1])
+    if voiced_audio:
+        return np.concatenate(voiced_audio)
+    else:
+        return np.array([], dtype=y.dtype)
+
+def compute_fcp_praat_style(freqs, ltas):
+    """(Lmax_0_2, Lmax_2_5, Lmax_5_8, Lmax_2_4, FCP, trend_at_peak) of one LTAS."""
+    # Bands
+    def band_max(f_lo, f_hi):
+        idx = np.where((freqs >= f_lo) & (freqs < f_hi))[0]
+        return np.max(ltas[idx]) if len(idx) else np.nan
+
+    Lmax_0_2 = band_max(0, 2000)
+    Lmax_2_5 = band_max(2000, 5000)
+    Lmax_5_8 = band_max(5000, 8000)
+    Lmax_2_4 = band_max(2000, 4000)
+
+    idx_1_5 = np.where((freqs >= 1000) & (freqs <= 5000))[0]
+    x_trend = freqs[idx_1_5]
+    y_trend = ltas[idx_1_5]
+    m, b = np.polyfit(x_trend, y_trend, 1)
+
+    # Trendline at LTAS points in 2–4 kHz
+    idx_2_4 = np.where((freqs >= 2000) & (freqs < 4000))[0]
+    x_peak = freqs[idx_2_4]
+    y_peak = ltas[idx_2_4]
+    peak_rel = np.argmax(y_peak)
+    f_peak = x_peak[peak_rel]
+    trend_at_peak = m * f_peak + b
+    fcp = y_peak[peak_rel] - trend_at_peak
+    return Lmax_0_2, Lmax_2_5, Lmax_5_8, Lmax_2_4, fcp, trend_at_peak
+
+def sliding_windows(y, fs, win_samples, step_samples, bandwidth=350, mask=None):
+    """
+    Per-window (start, Lmax_0_2, Lmax_2_5, Lmax_5_8, Lmax_2_4, FCP, freqs, ltas)
+    for every sliding window with a voiced frame, each window analysed on its own
+    with the matching slice of the whole-file mask.
+    """
+    if mask is None:
+        mask = get_voiced_mask(y, fs)
+    rows = []
+    for start in range(0, len(y) - win_samples + 1, step_samples):
+        freqs, ltas = compute_ltas_voiced_like_praat(y[start:start + win_samples], fs, bandwidth,
+                                                     mask=mask[start:start + win_samples])
+        if len(ltas) < 1 or np.isnan(ltas).all():
+            continue
+        L0_2, L2_5, L5_8, L2_4, fcp, _ = compute_fcp_praat_style(freqs, ltas)
+        rows.append((start, L0_2, L2_5, L5_8, L2_4, fcp, freqs, ltas))
+    return rows
@@ -0,0 +1,180 @@
+# fcp_results.py
+
+import threading
+import numpy as np
+
+# Numeric per-window metrics, in export order
+METRICS = (
+    "window_start_sec", "window_end_sec",
+    "Lmax_0_2", "Lmax_2_5", "Lmax_5_8", "Lmax_2_4",
+    "FCP", "Trend_at_FCP_Peak",
+    "Delta_0_2_2_5", "Delta_2_5_5_8",
+    "Delta_0_2_5_8", "Delta_2_4"
+)
+INITIAL_CAPACITY = 256
+
+class WindowResults:
+    """
+    Columnar store for per-window analysis results (precomputed_buffer,
+    analysis_history): one float64 array per metric, one frequency axis shared
+    by all windows and an (n_windows, n_bands) LTAS matrix, instead of a list
+    of dicts each holding its own freqs/ltas arrays.
+
+    Rows are appended as dicts (the same dicts the analysis code used to put
+    in a list; missing metrics are NaN) and read back as dicts, so code that
+    indexes or iterates the results keeps working. Columns are grown by
+    doubling. append() may run in a worker thread while the GUI reads.
+    """
+
+    def __init__(self, filename=None):
+        self.filename = filename
+        self.freqs = None  # shared LTAS frequency axis (set by the first row with an LTAS)
+        self._lock = threading.Lock()
+        self._n = 0
+        self._present = set()  # metrics set by at least one row
+        self._columns = {name: np.full(INITIAL_CAPACITY, np.nan) for name in METRICS}
+        self._ltas = None
+
+    def __len__(self):
+        return self._n
+
+    def clear(self):
+        with self._lock:
+            self._n = 0
+            self._present.clear()
+            self.freqs = None
+            self._ltas = None
+            for col in self._columns.values():
+                col[:] = np.nan
+
+    def _grow(self, capacity):
+        for name, col in self._columns.items():
+            new = np.full(capacity, np.nan)
+            new[:len(col)] = col
+            self._columns[name] = new
+        if self._ltas is not None:
+            new = np.full((capacity, self._ltas.shape[1]), np.nan)
+            new[:len(self._ltas)] = self._ltas
+            self._ltas = new
+
+    def append(self, row):
+        """Append one window given as a dict of metrics (+ optional 'freqs'/'ltas')."""
+        with self._lock:
+            i = self._n
+            capacity = len(self._columns["FCP"])
+            if i == capacity:
+                capacity = max(2 * capacity, INITIAL_CAPACITY)
+                self._grow(capacity)
+            if self.filename is None:
+                self.filename = row.get("filename")
+            for name in METRICS:
+                if name in row:
+                    self._columns[name][i] = row[name]
+                    self._present.add(name)
+            ltas = row.get("ltas")
+            if ltas is not None and len(ltas):
+                if self._ltas is None:
+                    self.freqs = np.array(row["freqs"], dtype=float)
+                    self._ltas = np.full((capacity, len(self.freqs)), np.nan)
+                elif len(ltas) != self._ltas.shape[1]:
+                    raise ValueError("All windows must share one LTAS frequency axis")
+                self._ltas[i] = ltas
+            self._n = i + 1
+
+    def column(self, name):
+        """View of one metric over all windows (NaN where a row did not set it)."""
+        return self._columns[name][:self._n]
+
+    @property
+    def ltas(self):
+        """(n_windows, n_bands) LTAS matrix view, or None when no LTAS was stored."""
+        return None if self._ltas is None else self._ltas[:self._n]
+
+    def fields(self):
+        """Metrics set by at least one row, in METRICS order."""
+        return [name for name in METRICS if name in self._present]
+
+    def _row(self, columns, ltas, i):
+        row = {"filename": self.filename}
+        for name in self.fields():
+            row[name] = columns[name][i]
+        if ltas is not None:
+            row["freqs"] = self.freqs
+            row["ltas"] = ltas[i]
+        return row
+
+    def __getitem__(self, index):
+        n = self._n
+        if isinstance(index, slice):
+            out = WindowResults(self.filename)
+            start, stop, step = index.indices(n)
+            idx = np.arange(start, stop, step)
+            out._n = len(idx)
+            out._present = set(self._present)
+            out._columns = {name: col[idx] for name, col in self._columns.items()}
+            if self._ltas is not None:
+                out.freqs = self.freqs
+                out._ltas = self._ltas[idx]
+            return out
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("WindowResults index out of range")
+        return self._row(self._columns, self._ltas, index)
+
+    def __iter__(self):
+        n = self._n
+        columns = self._columns
+        ltas = self._ltas
+        for i in range(n):
+            yield self._row(columns, ltas, i)
+
+    # -------- Persistence (fcp_cache) --------
+    def to_arrays(self, prefix=""):
+        """Plain arrays for np.savez, names starting with prefix (see from_arrays)."""
+        arrays = {prefix + "fields": np.array(self.fields(), dtype=str)}
+        for name in self.fields():
+            arrays[prefix + "col_" + name] = self.column(name)
+        if self._ltas is not None:
+            arrays[prefix + "freqs"] = self.freqs
+            arrays[prefix + "ltas"] = self.ltas
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix="", filename=None):
+        """Rebuild a WindowResults saved with to_arrays."""
+        out = cls(filename)
+        fields = [str(name) for name in arrays[prefix + "fields"]]
+        n = len(arrays[prefix + "col_" + fields[0]]) if fields else 0
+        out._n = n
+        out._present = set(fields)
+        out._columns = {name: np.full(n, np.nan) for name in METRICS}
+        for name in fields:
+            out._columns[name][:] = arrays[prefix + "col_" + name]
+        if prefix + "ltas" in arrays:
+            out.freqs = np.array(arrays[prefix + "freqs"], dtype=float)
+            out._ltas = np.array(arrays[prefix + "ltas"], dtype=float)
+        return out
+
+    # -------- Export adapters --------
+    def rows(self, fieldnames):
+        """Dicts restricted to fieldnames (for csv.DictWriter), without LTAS."""
+        fields = [name for name in fieldnames if name == "filename" or name in self._present]
+        n = self._n
+        cols = {name: self.column(name) for name in fields if name != "filename"}
+        for i in range(n):
+            yield {name: self.filename if name == "filename" else cols[name][i] for name in fields}
+
+    def to_columns(self, fieldnames):
+        """Dict of column arrays for fieldnames (e.g. for pandas.DataFrame)."""
+        n = self._n
+        return {name: [self.filename] * n if name == "filename" else self.column(name).copy()
+                for name in fieldnames}
+
+    def nanmean(self, name):
+        """Mean of a metric over the windows where it is defined (NaN if none)."""
+        if name not in self._present:
+            return np.nan
+        values = self.column(name)
+        values = values[~np.isnan(values)]
+        return np.mean(values) if len(values) else np.nan
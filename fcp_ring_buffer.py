@@ -0,0 +1,94 @@
+# fcp_ring_buffer.py
+
+import numpy as np
+
+class AudioRingBuffer:
+    """
+    Preallocated single-producer / single-consumer ring buffer for live audio.
+
+    The PortAudio callback calls write() with each input block: the samples are
+    copied into place and the write counter is advanced afterwards, with no
+    allocation and no O(buffer) shifting. The analysis side calls snapshot()
+    or read_since() to get a consistent, chronologically ordered copy without
+    taking a lock: a sequence counter is bumped before and after every write
+    (odd while a write is in progress), and a read that overlaps a write is
+    simply retried.
+    """
+
+    def __init__(self, size, dtype=np.float64):
+        self.size = int(size)
+        self._data = np.zeros(self.size, dtype=dtype)
+        self._written = 0  # total samples ever written (monotonic)
+        self._seq = 0  # odd while a write is in progress
+
+    @property
+    def written(self):
+        """Total number of samples written since creation/clear."""
+        return self._written
+
+    def clear(self):
+        self._seq += 1
+        self._data[:] = 0
+        self._written = 0
+        self._seq += 1
+
+    def write(self, samples):
+        """
+        Append samples (1-D). Safe to call from the audio callback.
+        """
+        n = len(samples)
+        if n == 0:
+            return
+        if n > self.size:
+            # Only the newest `size` samples can be kept
+            samples = samples[n - self.size:]
+            skipped = n - self.size
+            n = self.size
+        else:
+            skipped = 0
+        self._seq += 1
+        pos = (self._written + skipped) % self.size
+        first = min(n, self.size - pos)
+        self._data[pos:pos + first] = samples[:first]
+        if first < n:
+            self._data[:n - first] = samples[first:]
+        self._written += skipped + n
+        self._seq += 1
+
+    def _copy_range(self, start, n, out):
+        pos = start % self.size
+        first = min(n, self.size - pos)
+        out[:first] = self._data[pos:pos + first]
+        if first < n:
+            out[first:n] = self._data[:n - first]
+
+    def snapshot(self, out=None, max_retries=8):
+        """
+        Return the newest `size` samples, oldest first.
+        out: optional preallocated array of length size (avoids allocation).
+        """
+        if out is None:
+            out = np.empty(self.size, dtype=self._data.dtype)
+        for _ in range(max_retries):
+            seq = self._seq
+            end = self._written
+            self._copy_range(end - self.size, self.size, out)
+            if seq % 2 == 0 and self._seq == seq:
+                break
+        return out
+
+    def read_since(self, position, max_retries=8):
+        """
+        Return (samples, new_position) with every sample written after `position`.
+        If more than `size` samples arrived since then, only the newest `size`
+        are returned (the older ones have already been overwritten).
+        """
+        for _ in range(max_retries):
+            seq = self._seq
+            end = self._written
+            n = max(min(end - position, self.size), 0)
+            out = np.empty(n, dtype=self._data.dtype)
+            self._copy_range(end - n, n, out)
+            if seq % 2 == 0 and self._seq == seq:
+                break
+        return out, end
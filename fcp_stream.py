@@ -0,0 +1,255 @@
+# fcp_stream.py
+
+import math
+import numpy as np
+import parselmouth
+from fcp_audio_io import StreamingResampler, iter_wav_mono_blocks, wav_info
+from fcp_ltas import LTASAccumulator
+from fcp_voiced_ltas import iter_sliding_ltas_voiced, voiced_mask_range
+
+# Pitch is tracked on regions of REGION_SECS, each padded by MARGIN_SECS of
+# context on both sides so Praat's path finder sees the same neighbourhood
+# as in a whole-file analysis. Only the region core is kept.
+REGION_SECS = 30.0
+MARGIN_SECS = 1.0
+# Input block size read from disk
+READ_BLOCK_SECS = 5.0
+PITCH_TIME_STEP = 0.01
+PITCH_WINDOW = 0.04  # 3 periods of Praat's 75 Hz default pitch floor
+SILENCE_THRESHOLD = 0.03  # Praat "To Pitch" default
+
+def praat_frame_grid(n_samples, fs, start_time=0.0, time_step=PITCH_TIME_STEP, window=PITCH_WINDOW):
+    """
+    (n_frames, first_time) of the frame grid Praat's pitch analysis uses for a
+    Sound of n_samples starting at start_time (Sampled_shortTermAnalysis).
+    """
+    dx = 1.0 / fs
+    duration = dx * n_samples
+    n_frames = math.floor((duration - window) / time_step) + 1
+    mid = start_time + 0.5 * duration
+    return n_frames, mid - 0.5 * n_frames * time_step + 0.5 * time_step
+
+def iter_resampled_blocks(path, fs_target, block_secs=READ_BLOCK_SECS):
+    """
+    Yield (n_total, None) once, then consecutive mono float64 blocks of the
+    file at fs_target (None = the file's own rate). n_total matches
+    fcp_audio_io.load_wav_mono's length.
+    """
+    fs_in, n_in = wav_info(path)
+    if fs_target is None:
+        fs_target = fs_in
+    n_total = int(n_in * fs_target / fs_in) if fs_in != fs_target else n_in
+    yield n_total, None
+    resampler = StreamingResampler(fs_target, fs_in) if fs_in != fs_target else None
+    emitted = 0
+    for block in iter_wav_mono_blocks(path, max(int(block_secs * fs_in), 1)):
+        out = resampler.process(block) if resampler is not None else block.astype(np.float64)
+        out = out[:n_total - emitted]
+        emitted += len(out)
+        if len(out):
+            yield None, out
+    if resampler is not None:
+        out = resampler.flush()[:n_total - emitted]
+        if len(out):
+            yield None, out
+
+def iter_array_blocks(data, fs, block_secs=READ_BLOCK_SECS):
+    """Same as iter_resampled_blocks, for audio already decoded at fs."""
+    yield len(data), None
+    block = max(int(block_secs * fs), 1)
+    for i in range(0, len(data), block):
+        yield None, data[i:i + block]
+
+def _global_peak(blocks):
+    # Praat's silence threshold is relative to max |x - mean(x)| over the whole sound
+    total = 0.0
+    lo = np.inf
+    hi = -np.inf
+    count = 0
+    for _, block in blocks:
+        if block is None:
+            continue
+        total += float(np.sum(block, dtype=np.float64))
+        lo = min(lo, float(np.min(block)))
+        hi = max(hi, float(np.max(block)))
+        count += len(block)
+    if count == 0:
+        return 0.0
+    mean = total / count
+    return max(hi - mean, mean - lo)
+
+def analyze_wav_streaming(path, fs_target=44100, window_secs=1.0, step_secs=0.1, bandwidth=350,
+                          on_window=None, dtype=np.float64, data=None):
+    """
+    Out-of-core equivalent of the in-memory file analysis: voiced sliding-window
+    LTAS plus the global voiced LTAS, with memory bounded by REGION_SECS rather
+    than by the file length.
+
+    The file is read in blocks, resampled with a streaming polyphase resampler
+    and pitch-tracked region by region. Each region's Praat frame grid is aligned
+    with the whole-file grid and its silence threshold is rescaled to the
+    whole-file peak (one extra cheap pass), so voicing matches the whole-file
+    track up to path-finder effects at region edges.
+
+    fs_target: analysis rate, or None to analyse at the file's own rate.
+    data: optional mono array of the file already decoded at that rate; the
+          regions are then cut from it and the file is not read again.
+    dtype: sample type of the LTAS computations (np.float32: single-precision path).
+    on_window(start, freqs, ltas) is called for every sliding window in order
+    (ltas is empty for windows without voiced frames).
+    Returns a dict with freqs_full, ltas_full (global voiced LTAS, empty if no
+    voiced audio), voiced_samples, n_samples and fs.
+    """
+    if fs_target is None:
+        fs_target = wav_info(path)[0]
+    fs = fs_target
+    win_samples = int(window_secs * fs)
+    step_samples = int(step_secs * fs)
+    region = int(REGION_SECS * fs)
+    margin = int(MARGIN_SECS * fs)
+    hop = int(PITCH_TIME_STEP * fs)
+    mask_pad = int(0.01 * fs // 2) + 10  # reach of one voiced frame in get_voiced_mask
+
+    def open_blocks():
+        if data is not None:
+            return iter_array_blocks(data, fs)
+        return iter_resampled_blocks(path, fs_target)
+
+    global_peak = _global_peak(open_blocks())
+    blocks = open_blocks()
+    n_total, _ = next(blocks)
+    n_frames, t1 = praat_frame_grid(n_total, fs)
+
+    def grid_error(a, length):
+        _, t1_r = praat_frame_grid(length, fs, a / fs)
+        k = (t1_r - t1) / PITCH_TIME_STEP
+        return abs(k - round(k))
+
+    audio = np.zeros(0, dtype=dtype)
+    audio_start = 0  # absolute sample index of audio[0]
+    track_k = np.zeros(0, dtype=int)  # known file-grid pitch frames still needed
+    track_f = np.zeros(0)
+    core_start = 0  # next region core start (samples)
+    k_known = 0  # pitch frames [0, k_known) are known
+    next_window = 0
+    acc = LTASAccumulator(fs, bandwidth=bandwidth, dtype=dtype)
+    seg_open = None  # start time of the voiced run in progress
+    seg_pushed = 0  # audio of the open run pushed to acc up to this sample
+
+    def frame_times(k):
+        return t1 + k * PITCH_TIME_STEP
+
+    def track_region():
+        nonlocal core_start, k_known, track_k, track_f
+        core_end = min(core_start + region, n_total)
+        if n_total - core_end < margin:
+            core_end = n_total
+        a = max(core_start - margin, 0)
+        end = min(core_end + margin, n_total)
+        if a == 0 and end == n_total:
+            pass  # whole file: same grid by construction
+        elif end == n_total:
+            a = min(range(max(a - 2 * hop, 0), a + 1), key=lambda s: grid_error(s, end - s))
+        else:
+            end = a + min(range(end - a - 2 * hop, end - a + 1), key=lambda n: grid_error(a, n))
+        seg = audio[a - audio_start:end - audio_start]
+        peak = np.max(np.abs(seg - np.mean(seg)))
+        silence = SILENCE_THRESHOLD
+        if (a, end) != (0, n_total) and peak > 0:
+            silence = SILENCE_THRESHOLD * global_peak / peak
+        pitch = parselmouth.Sound(seg, fs, start_time=a / fs).to_pitch_ac(
+            time_step=PITCH_TIME_STEP, silence_threshold=silence)
+        k = np.round((pitch.xs() - t1) / PITCH_TIME_STEP).astype(int)
+        k_end = n_frames if core_end == n_total else \
+            max(math.ceil((core_end / fs - t1) / PITCH_TIME_STEP), k_known)
+        values = np.zeros(k_end - k_known)
+        sel = (k >= k_known) & (k < k_end)
+        values[k[sel] - k_known] = pitch.selected_array['frequency'][sel]
+        track_k = np.concatenate((track_k, np.arange(k_known, k_end)))
+        track_f = np.concatenate((track_f, values))
+        new_k = np.arange(k_known, k_end)
+        k_known = k_end
+        core_start = core_end
+        return new_k, values
+
+    def process_windows():
+        nonlocal next_window
+        if k_known >= n_frames:
+            ready = n_total
+        else:
+            ready = min(int(frame_times(k_known) * fs) - mask_pad - 1, n_total)
+        last = (min(ready, n_total) - win_samples - next_window) // step_samples
+        if last < 0:
+            return
+        first = next_window
+        stop = first + last * step_samples + win_samples
+        track = (frame_times(track_k), track_f)
+        mask = voiced_mask_range(track, fs, n_total, first, stop)
+        buf = audio[first - audio_start:stop - audio_start]
+        for rel, freqs, ltas in iter_sliding_ltas_voiced(buf, fs, win_samples, step_samples,
+                                                         bandwidth=bandwidth, mask=mask):
+            if on_window is not None:
+                on_window(first + rel, freqs, ltas)
+        next_window = first + (last + 1) * step_samples
+
+    def push_voiced(i0, i1):
+        if i1 > i0:
+            acc.push(audio[i0 - audio_start:i1 - audio_start])
+
+    def process_segments(new_k, values):
+        # Same run detection as extract_only_voiced_segments, applied frame by frame
+        nonlocal seg_open, seg_pushed
+        times = frame_times(new_k)
+        for t, f in zip(times, values):
+            if f > 0:
+                if seg_open is None:
+                    seg_open = t
+                    seg_pushed = int(t * fs)
+            elif seg_open is not None:
+                if t - seg_open >= 0.05:
+                    push_voiced(seg_pushed, int(t * fs))
+                seg_open = None
+        if seg_open is not None and len(times) and times[-1] - seg_open >= 0.05:
+            # The run is long enough to be kept whatever happens next: push what we have
+            push_voiced(seg_pushed, int(times[-1] * fs))
+            seg_pushed = int(times[-1] * fs)
+
+    def trim():
+        nonlocal audio, audio_start, track_k, track_f
+        keep_from = min(next_window, max(core_start - margin - 2 * hop, 0))
+        if seg_open is not None:
+            keep_from = min(keep_from, seg_pushed)
+        if keep_from > audio_start:
+            audio = audio[keep_from - audio_start:]
+            audio_start = keep_from
+        needed = frame_times(track_k) * fs >= next_window - mask_pad - 1
+        track_k = track_k[needed]
+        track_f = track_f[needed]
+
+    def available():
+        return audio_start + len(audio)
+
+    for _, block in blocks:
+        audio = np.concatenate((audio, block.astype(dtype, copy=False)))
+        while core_start < n_total:
+            core_end = min(core_start + region, n_total)
+            if n_total - core_end < margin:
+                core_end = n_total
+            if available() < min(core_end + margin, n_total):
+                break
+            new_k, values = track_region()
+            process_windows()
+            process_segments(new_k, values)
+            trim()
+
+    if seg_open is not None and k_known > 0 and frame_times(k_known - 1) - seg_open >= 0.05:
+        push_voiced(seg_pushed, int(frame_times(k_known - 1) * fs))
+
+    freqs_full, ltas_full = acc.ltas()
+    return {
+        "freqs_full": freqs_full,
+        "ltas_full": ltas_full,
+        "voiced_samples": acc.n_samples,
+        "n_samples": n_total,
+        "fs": fs,
+    }
@@ -0,0 +1,78 @@
+# fcp_validate.py
+
+import argparse
+import glob
+import os
+import time
+import numpy as np
+from fcp_audio_io import wav_info
+from fcp_batch import analyze_wav
+
+# Highest frequency the FCP bands use; LTAS drift is measured up to here
+MAX_FREQ = 8000
+GLOBAL_KEYS = ("global_Lmax_0_2", "global_Lmax_2_5", "global_Lmax_5_8", "global_Lmax_2_4", "global_FCP")
+
+def native_rate_drift(path, fs_target=44100, **params):
+    """
+    Analyse one file twice, resampled to fs_target and at its own sample rate,
+    and measure how far the native-rate results drift from the resampled ones.
+    params: forwarded to fcp_batch.analyze_wav (window_secs, step_secs, ...)
+    Returns a dict with the file rate, both run times, the largest global LTAS
+    (0-MAX_FREQ) and global metric differences (dB), and per-window FCP
+    differences over the windows both runs kept (matched by start time).
+    """
+    fs_in, _ = wav_info(path)
+    t0 = time.perf_counter()
+    ref_summary, ref_rows, ref_freqs, ref_ltas = analyze_wav(path, fs_target, **params)
+    t1 = time.perf_counter()
+    nat_summary, nat_rows, nat_freqs, nat_ltas = analyze_wav(path, None, **params)
+    t2 = time.perf_counter()
+
+    report = {
+        "filename": os.path.basename(path),
+        "file_fs": fs_in,
+        "resampled_secs": t1 - t0,
+        "native_secs": t2 - t1,
+    }
+    for key in GLOBAL_KEYS:
+        report[key + "_diff"] = abs(nat_summary[key] - ref_summary[key])
+
+    # Global LTAS over the FCP bands (same Hz grid at any rate, so same leading bins)
+    if ref_ltas is not None and nat_ltas is not None:
+        n = min(len(ref_ltas), len(nat_ltas))
+        keep = ref_freqs[:n] < min(MAX_FREQ, fs_in / 2, fs_target / 2)
+        report["global_ltas_max_diff"] = float(np.nanmax(np.abs(nat_ltas[:n] - ref_ltas[:n])[keep]))
+    else:
+        report["global_ltas_max_diff"] = np.nan
+
+    ref_fcp = {round(r["window_start_sec"], 6): r["FCP"] for r in ref_rows}
+    nat_fcp = {round(r["window_start_sec"], 6): r["FCP"] for r in nat_rows}
+    common = sorted(ref_fcp.keys() & nat_fcp.keys())
+    diffs = np.array([abs(nat_fcp[t] - ref_fcp[t]) for t in common])
+    report["windows_compared"] = len(common)
+    report["windows_only_one_path"] = len(ref_fcp.keys() ^ nat_fcp.keys())
+    report["window_FCP_max_diff"] = float(np.nanmax(diffs)) if len(diffs) else np.nan
+    report["window_FCP_mean_diff"] = float(np.nanmean(diffs)) if len(diffs) else np.nan
+    return report
+
+def print_drift_report(reports):
+    print(f"{'file':<28}{'fs':>7}{'resamp s':>10}{'native s':>10}{'LTAS dB':>9}"
+          f"{'gFCP dB':>9}{'wFCP max':>10}{'wFCP mean':>10}{'windows':>9}{'unmatched':>10}")
+    for r in reports:
+        print(f"{r['filename'][:27]:<28}{r['file_fs']:>7}{r['resampled_secs']:>10.2f}{r['native_secs']:>10.2f}"
+              f"{r['global_ltas_max_diff']:>9.3f}{r['global_FCP_diff']:>9.3f}"
+              f"{r['window_FCP_max_diff']:>10.3f}{r['window_FCP_mean_diff']:>10.3f}"
+              f"{r['windows_compared']:>9}{r['windows_only_one_path']:>10}")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Drift of native-sample-rate analysis against the resampled (fs_target) path.")
+    parser.add_argument("wavs", nargs="*", help="WAV files (default: examples/*.wav)")
+    parser.add_argument("--fs-target", type=int, default=44100)
+    args = parser.parse_args()
+    paths = args.wavs or sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                       "examples", "*.wav")))
+    print_drift_report([native_rate_drift(p, args.fs_target) for p in paths])
+
+if __name__ == "__main__":
+    main()
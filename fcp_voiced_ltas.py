@@ -1,82 +1,253 @@
-# fcp_voiced_ltas.py
-
-import numpy as np
-import parselmouth
-from scipy.signal import get_window
-
-def get_voiced_mask(y, fs):
-    snd = parselmouth.Sound(y, fs)
-    pitch = snd.to_pitch(time_step=0.01)
-    pitch_values = pitch.selected_array['frequency']
-    pitch_times = pitch.xs()
-    mask = np.zeros(len(y), dtype=bool)
-    for i, t in enumerate(pitch_times):
-        idx = int(t * fs)
-        if idx < len(mask) and pitch_values[i] > 0:
-            # Marks 10 ms around the center as voiced
-            win = int(0.01 * fs // 2)
-            mask[max(0, idx-win):min(len(mask), idx+win)] = True
-    # Dilate the mask to avoid abrupt cuts
-    from scipy.ndimage import binary_dilation
-    mask = binary_dilation(mask, iterations=10)
-    return mask
-
-def compute_ltas_voiced_like_praat(y, fs, bandwidth=350):
-    mask = get_voiced_mask(y, fs)
-    win_len = int(0.04 * fs)
-    hop_len = int(0.01 * fs)
-    frames = []
-    for start in range(0, len(y) - win_len + 1, hop_len):
-        seg = y[start:start + win_len]
-        msk = mask[start:start + win_len]
-        if np.mean(msk) < 0.5:
-            continue  # Only include truly voiced windows!
-        segment = seg * np.hanning(win_len)
-        spectrum = np.abs(np.fft.rfft(segment))
-        spectrum_db = 20 * np.log10(spectrum + 1e-12)
-        frames.append(spectrum_db)
-    if not frames:
-        return np.array([]), np.array([])
-    frames = np.stack(frames)
-    avg_spectrum = np.mean(frames, axis=0)
-    freqs = np.fft.rfftfreq(win_len, 1/fs)
-    bins = np.arange(0, freqs[-1] + bandwidth, bandwidth)
-    ltas = [np.max(avg_spectrum[(freqs >= bins[i]) & (freqs < bins[i+1])]) for i in range(len(bins) - 1)]
-    bin_centers = 0.5 * (bins[:-1] + bins[1:])
-    return bin_centers, np.array(ltas)
-
-def extract_only_voiced_segments(y, fs):
-    """
-    Returns a concatenated array with only the voiced segments, detected via Parselmouth (equivalent to the Praat script).
-    """
-    snd = parselmouth.Sound(y, fs)
-    pitch = snd.to_pitch(time_step=0.01)
-    pitch_values = pitch.selected_array['frequency']
-    pitch_times = pitch.xs()
-    voiced = pitch_values > 0
-
-    # Find starts and ends of voiced segments
-    segments = []
-    start_time = None
-    for i, v in enumerate(voiced):
-        t = pitch_times[i]
-        if v:
-            if start_time is None:
-                start_time = t
-        else:
-            if start_time is not None:
-                if t - start_time >= 0.05:  # only take segments longer than 50 ms
-                    segments.append((start_time, t))
-                start_time = None
-    if start_time is not None and pitch_times[-1] - start_time >= 0.05:
-        segments.append((start_time, pitch_times[-1]))
-
-    voiced_audio = []
-    for t0, t1 in segments:
-        i0 = int(t0 * fs)
-        i1 = int(t1 * fs)
-        voiced_audio.append(y[i0:i1])
-    if voiced_audio:
-        return np.concatenate(voiced_audio)
-    else:
-        return np.array([], dtype=y.dtype)
+# fcp_voiced_ltas.py
+
+import numpy as np
+import parselmouth
+from fcp_ltas import FRAME_BLOCK, add_spectra_db, band_max_db, frame_signal, frame_spectra_db
+
+# Frames per block of cached spectra in iter_sliding_ltas_voiced
+SPECTRUM_BLOCK = 256
+# Re-sum the running window total from the cache every N windows to bound float drift
+RESYNC_WINDOWS = 512
+# Samples added on each side of the voiced spans (the mask's binary dilation, 10 iterations)
+MASK_DILATION = 10
+
+def get_pitch_track(y, fs, time_step=0.01):
+    """
+    Run Praat pitch tracking once and return (pitch_times, pitch_values).
+    Unvoiced frames have a pitch value of 0.
+    """
+    snd = parselmouth.Sound(y, fs)
+    pitch = snd.to_pitch(time_step=time_step)
+    return pitch.xs(), pitch.selected_array['frequency']
+
+def get_voiced_mask(y, fs, pitch_track=None):
+    """
+    Per-sample voicing mask for y. Pass a precomputed pitch_track
+    (from get_pitch_track) to avoid running Praat again.
+    Built from voiced_intervals, without a per-frame loop or a dilation pass.
+    """
+    if pitch_track is None:
+        pitch_track = get_pitch_track(y, fs)
+    starts, ends = voiced_intervals(pitch_track, fs, len(y))
+    return intervals_mask(starts, ends, 0, len(y))
+
+def voiced_intervals(pitch_track, fs, n):
+    """
+    The voicing mask of a signal of length n as sorted, disjoint sample
+    intervals [starts[i], ends[i]). Each voiced pitch frame marks 10 ms around
+    its centre (clipped to the signal); the mask was then dilated by
+    MASK_DILATION samples, which on intervals is widening each one by that
+    much on both sides. Overlapping or touching intervals are merged.
+    """
+    pitch_times, pitch_values = pitch_track
+    idx = (np.asarray(pitch_times) * fs).astype(int)
+    idx = idx[(np.asarray(pitch_values) > 0) & (idx < n)]
+    win = int(0.01 * fs // 2)
+    lo = np.maximum(idx - win, 0)
+    hi = np.minimum(idx + win, n)
+    nonempty = lo < hi
+    lo = np.maximum(lo[nonempty] - MASK_DILATION, 0)
+    hi = np.minimum(hi[nonempty] + MASK_DILATION, n)
+    if len(lo) == 0:
+        return lo, hi
+    # Pitch times increase, so lo and hi are non-decreasing: a new interval starts
+    # wherever a frame's span begins after the previous one ended
+    first = np.concatenate(([True], lo[1:] > hi[:-1]))
+    last = np.concatenate((first[1:], [True]))
+    return lo[first], hi[last]
+
+def mask_intervals(mask):
+    """(starts, ends) of the runs of True in a boolean mask."""
+    mask = np.asarray(mask, dtype=bool)
+    if len(mask) == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+    edges = np.flatnonzero(mask[1:] != mask[:-1]) + 1  # compared as bool: one byte per sample
+    if mask[0]:
+        edges = np.concatenate(([0], edges))
+    if mask[-1]:
+        edges = np.concatenate((edges, [len(mask)]))
+    return edges[0::2], edges[1::2]
+
+def intervals_mask(starts, ends, a, b):
+    """
+    Samples [a, b) of the boolean mask that is True on the sorted, disjoint
+    intervals [starts[i], ends[i]), written run by run with np.repeat.
+    """
+    bounds = np.column_stack((np.clip(starts, a, b), np.clip(ends, a, b))).ravel() - a
+    runs = np.diff(np.concatenate(([0], bounds, [b - a])))
+    values = np.arange(len(runs)) % 2 == 1  # gaps and intervals alternate
+    return np.repeat(values, runs)
+
+def voiced_mask_range(pitch_track, fs, n, a, b):
+    """
+    Samples [a, b) of get_voiced_mask(y, fs, pitch_track) for a signal of
+    length n, built without materialising the full-length mask.
+    """
+    starts, ends = voiced_intervals(pitch_track, fs, n)
+    return intervals_mask(starts, ends, a, b)
+
+def interval_coverage(starts, ends, x):
+    """Number of samples in [0, x) covered by the disjoint sorted intervals, for each x."""
+    x = np.asarray(x)
+    if len(starts) == 0:
+        return np.zeros(x.shape, dtype=int)
+    before = np.concatenate(([0], np.cumsum(ends - starts)))
+    j = np.searchsorted(ends, x, side='right')  # intervals ending at or before x
+    partial = starts[np.minimum(j, len(starts) - 1)]
+    inside = (j < len(starts)) & (partial < x)
+    return before[j] + np.where(inside, x - partial, 0)
+
+def voiced_frames(mask, n_win, n_hop):
+    """
+    Voicing decision for each frame of frame_signal(y, n_win, n_hop): at least
+    half of the frame's samples voiced in mask. Voiced sample counts come from
+    the mask's intervals (a cumulative coverage), not from a per-frame mean.
+    """
+    n = len(mask)
+    starts, ends = mask_intervals(mask)
+    if n_win <= 0 or n_hop <= 0 or n < n_win:
+        return np.zeros(0, dtype=bool)
+    frame_starts = np.arange((n - n_win) // n_hop + 1) * n_hop
+    counts = interval_coverage(starts, ends, frame_starts + n_win) - interval_coverage(starts, ends, frame_starts)
+    return 2 * counts >= n_win
+
+def compute_ltas_voiced_like_praat(y, fs, bandwidth=350, mask=None, win_len=0.04, hop_len=0.01):
+    """
+    LTAS over the voiced frames of y only.
+    mask: optional per-sample voicing mask aligned with y. When analysing many
+          windows of one file, compute get_voiced_mask once for the whole file
+          and pass the matching slice here instead of re-running pitch tracking.
+    win_len, hop_len: frame length and hop in seconds; bands are bandwidth Hz
+          wide whatever fs is, so any sample rate can be analysed directly.
+    """
+    if mask is None:
+        mask = get_voiced_mask(y, fs)
+    win_len = int(win_len * fs)
+    hop_len = int(hop_len * fs)
+    frames = frame_signal(y, win_len, hop_len)
+    # Only include truly voiced windows (at least half of the frame's samples voiced)
+    voiced = np.flatnonzero(voiced_frames(mask, win_len, hop_len))
+    if len(voiced) == 0:
+        return np.array([]), np.array([])
+    # Voiced frames are gathered and transformed FRAME_BLOCK at a time (bounded memory)
+    window = np.hanning(win_len)
+    sum_db = np.zeros(win_len // 2 + 1)
+    for i in range(0, len(voiced), FRAME_BLOCK):
+        add_spectra_db(sum_db, frames[voiced[i:i + FRAME_BLOCK]], window)
+    return band_max_db(sum_db / len(voiced), win_len, fs, bandwidth)
+
+def iter_sliding_ltas_voiced(y, fs, win_samples, step_samples, bandwidth=350, mask=None,
+                             win_len=0.04, hop_len=0.01):
+    """
+    Voiced-only LTAS of every sliding window of y, computed incrementally.
+    Yields (start, bin_centers, ltas) for starts 0, step, 2*step, ... exactly like
+    calling compute_ltas_voiced_like_praat(y[start:start + win_samples], ...)
+    with the matching mask slice; ltas is empty when a window has no voiced frame.
+
+    Each 40 ms frame spectrum is computed once (in blocks, voiced frames only) and
+    the window average is kept as a running sum: frames entering the window are
+    added and frames leaving it are subtracted, so the cost per window is O(step).
+    mask: per-sample voicing mask for the whole of y (see get_voiced_mask).
+          If None, pitch is tracked separately inside every window (legacy).
+    win_len, hop_len: frame length and hop in seconds (as in compute_ltas_voiced_like_praat)
+    """
+    n = len(y)
+    starts = range(0, n - win_samples + 1, step_samples)
+    n_win = int(win_len * fs)
+    n_hop = int(hop_len * fs)
+    aligned = n_hop > 0 and step_samples % n_hop == 0 and win_samples >= n_win
+    if mask is None or not aligned:
+        # Per-window path: legacy pitch tracking, or windows not on the frame grid
+        for start in starts:
+            msk = None if mask is None else mask[start:start + win_samples]
+            freqs, ltas = compute_ltas_voiced_like_praat(y[start:start + win_samples], fs,
+                                                         bandwidth=bandwidth, mask=msk,
+                                                         win_len=win_len, hop_len=hop_len)
+            yield start, freqs, ltas
+        return
+
+    window = np.hanning(n_win)
+    frames = frame_signal(y, n_win, n_hop)
+    frame_voiced = voiced_frames(mask, n_win, n_hop)
+    frames_per_win = (win_samples - n_win) // n_hop + 1
+    n_bins = n_win // 2 + 1
+    spectra_dtype = np.float32 if frames.dtype == np.float32 else np.float64  # float32 path keeps its cache small
+    blocks = {}  # block index -> (spectra_db, voiced); unvoiced rows stay zero
+
+    def get_block(b):
+        if b not in blocks:
+            lo = b * SPECTRUM_BLOCK
+            hi = min(lo + SPECTRUM_BLOCK, len(frames))
+            voiced = frame_voiced[lo:hi]
+            spectra = np.zeros((hi - lo, n_bins), dtype=spectra_dtype)
+            if voiced.any():
+                spectra[voiced] = frame_spectra_db(frames[lo:hi][voiced], window)
+            blocks[b] = (spectra, voiced)
+        return blocks[b]
+
+    def frame_sum(f0, f1):
+        # Sum of voiced spectra and voiced count over frames [f0, f1)
+        total = np.zeros(n_bins)
+        count = 0
+        while f0 < f1:
+            b, off = divmod(f0, SPECTRUM_BLOCK)
+            spectra, voiced = get_block(b)
+            end = min(f1 - f0, len(voiced) - off) + off
+            total += spectra[off:end].sum(axis=0, dtype=np.float64)
+            count += int(voiced[off:end].sum())
+            f0 += end - off
+        return total, count
+
+    sum_db = np.zeros(n_bins)
+    count = 0
+    lo = hi = 0  # frames currently in the running sum
+    for k, start in enumerate(starts):
+        f0 = start // n_hop
+        f1 = f0 + frames_per_win
+        if k % RESYNC_WINDOWS == 0 or f0 >= hi:
+            sum_db, count = frame_sum(f0, f1)
+        else:
+            out_db, out_count = frame_sum(lo, f0)
+            in_db, in_count = frame_sum(hi, f1)
+            sum_db += in_db - out_db
+            count += in_count - out_count
+        lo, hi = f0, f1
+        for b in [b for b in blocks if (b + 1) * SPECTRUM_BLOCK <= lo]:
+            del blocks[b]
+        if count == 0:
+            yield start, np.array([]), np.array([])
+            continue
+        freqs, ltas = band_max_db(sum_db / count, n_win, fs, bandwidth)
+        yield start, freqs, ltas
+
+def voiced_segments(pitch_track, fs, min_secs=0.05):
+    """
+    Sample bounds (i0, i1) of the voiced runs of a pitch track that last at
+    least min_secs. A run goes from its first voiced frame to the first
+    unvoiced frame after it (or to the last frame if the track ends voiced).
+    """
+    pitch_times, pitch_values = pitch_track
+    pitch_times = np.asarray(pitch_times)
+    voiced = (np.asarray(pitch_values) > 0).view(np.int8)
+    edges = np.diff(voiced, prepend=0, append=0)
+    first = np.flatnonzero(edges == 1)
+    after = np.flatnonzero(edges == -1)
+    if len(first) == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+    t0 = pitch_times[first]
+    t1 = pitch_times[np.minimum(after, len(pitch_times) - 1)]
+    keep = t1 - t0 >= min_secs
+    return (t0[keep] * fs).astype(int), (t1[keep] * fs).astype(int)
+
+def extract_only_voiced_segments(y, fs, pitch_track=None):
+    """
+    Returns a concatenated array with only the voiced segments, detected via Parselmouth (equivalent to the Praat script).
+    pitch_track: optional (pitch_times, pitch_values) from get_pitch_track.
+    """
+    if pitch_track is None:
+        pitch_track = get_pitch_track(y, fs)
+    i0, i1 = voiced_segments(pitch_track, fs)
+    if len(i0):
+        return np.concatenate([y[a:b] for a, b in zip(i0, i1)])
+    else:
+        return np.array([], dtype=y.dtype)
@@ -0,0 +1,145 @@
+# fcp_voicing.py
+# Lightweight voicing detector for LIVE mode (NumPy only, no Praat call).
+#
+#   python fcp_voicing.py [files.wav ...]   # agreement with the Parselmouth mask
+
+import numpy as np
+
+# Pitch search range (Hz); 75 Hz is Praat's default floor, whose 3 periods are the 40 ms LTAS frame
+PITCH_FLOOR = 75
+PITCH_CEILING = 600
+# A frame is voiced when its normalized autocorrelation peaks above this (Praat's default
+# voicing threshold) and its peak amplitude reaches SILENCE_THRESHOLD of the loudest sample so far
+VOICING_THRESHOLD = 0.45
+SILENCE_THRESHOLD = 0.05
+
+def frame_periodicity(frames, fs, pitch_floor=PITCH_FLOOR, pitch_ceiling=PITCH_CEILING):
+    """
+    Highest normalized autocorrelation of each frame over the lags of the pitch
+    range (1 = perfectly periodic), for a whole (n_frames, n_win) matrix at once.
+    The autocorrelation comes from one batched FFT; each lag is normalized by
+    the energy of the two overlapping parts (from a cumulative sum), so long
+    lags are not penalised for overlapping fewer samples.
+    """
+    n_frames, n = frames.shape
+    lag_max = min(int(fs / pitch_floor), n - 1)
+    lag_min = max(int(fs / pitch_ceiling), 1)
+    if n_frames == 0 or lag_min > lag_max:
+        return np.zeros(n_frames)
+    x = frames - frames.mean(axis=1, keepdims=True)
+    n_fft = 1 << (n + lag_max - 1).bit_length()  # no circular wrap up to lag_max
+    spectrum = np.fft.rfft(x, n_fft, axis=1)
+    r = np.fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2, n_fft, axis=1)[:, lag_min:lag_max + 1]
+    energy = np.zeros((n_frames, n + 1))
+    np.cumsum(x * x, axis=1, out=energy[:, 1:])
+    lags = np.arange(lag_min, lag_max + 1)
+    head = energy[:, n - lags]  # x[0:n-lag]
+    tail = energy[:, n:] - energy[:, lags]  # x[lag:n]
+    return (r / np.sqrt(head * tail + 1e-20)).max(axis=1)
+
+class StreamingVoicingDetector:
+    """
+    Per-frame voiced/unvoiced decision for a live stream. Frames are the 40 ms
+    LTAS frames themselves (see RollingLTAS), passed in stream order: a frame is
+    voiced when it is periodic within the pitch range and not silent. Silence is
+    judged against the loudest sample seen so far, the streaming counterpart of
+    Praat's threshold relative to the global peak of a sound.
+    """
+
+    def __init__(self, fs, pitch_floor=PITCH_FLOOR, pitch_ceiling=PITCH_CEILING,
+                 voicing_threshold=VOICING_THRESHOLD, silence_threshold=SILENCE_THRESHOLD):
+        self.fs = fs
+        self.pitch_floor = pitch_floor
+        self.pitch_ceiling = pitch_ceiling
+        self.voicing_threshold = voicing_threshold
+        self.silence_threshold = silence_threshold
+        self.reset()
+
+    def reset(self):
+        self.peak = 0.0  # loudest absolute sample so far
+
+    def voiced(self, frames):
+        """Boolean voicing decision for each row of frames (n_frames, n_win)."""
+        if len(frames) == 0:
+            return np.zeros(0, dtype=bool)
+        amplitude = np.abs(frames).max(axis=1)
+        peak = np.maximum(np.maximum.accumulate(amplitude), self.peak)
+        self.peak = float(peak[-1])
+        loud = amplitude >= self.silence_threshold * peak
+        voiced = np.zeros(len(frames), dtype=bool)
+        if loud.any():
+            voiced[loud] = frame_periodicity(frames[loud], self.fs, self.pitch_floor,
+                                             self.pitch_ceiling) > self.voicing_threshold
+        return voiced
+
+def voicing_agreement(path, fs_target=44100, block_secs=0.1, bandwidth=350, win_len=0.04, hop_len=0.01):
+    """
+    Compare StreamingVoicingDetector with the file-mode Parselmouth mask on one file.
+    The detector sees the file in block_secs pieces, as in LIVE mode. Frames
+    are the 40 ms LTAS frames; the reference calls a frame voiced when at least
+    half of its samples are in get_voiced_mask (as compute_ltas_voiced_like_praat).
+    Returns a dict with the agreement, precision and recall of the detector,
+    both voiced fractions, the global voiced FCP with either decision, and the
+    detector's CPU time per second of audio.
+    """
+    import os
+    import time
+    from fcp_audio_io import load_wav_mono
+    from fcp_ltas import band_max_db, compute_fcp_praat_style, frame_signal, frame_spectra_db
+    from fcp_voiced_ltas import get_voiced_mask, voiced_frames
+
+    y, fs = load_wav_mono(path, fs_target)
+    n_win = int(win_len * fs)
+    n_hop = int(hop_len * fs)
+    frames = frame_signal(y, n_win, n_hop)
+    reference = voiced_frames(get_voiced_mask(y, fs), n_win, n_hop)
+
+    detector = StreamingVoicingDetector(fs)
+    frames_per_block = max(int(block_secs / hop_len), 1)
+    t0 = time.perf_counter()
+    detected = np.concatenate([detector.voiced(frames[i:i + frames_per_block])
+                               for i in range(0, len(frames), frames_per_block)] or [np.zeros(0, dtype=bool)])
+    cpu_secs = time.perf_counter() - t0
+
+    def global_fcp(voiced):
+        if not voiced.any():
+            return np.nan
+        freqs, ltas = band_max_db(frame_spectra_db(frames[voiced], np.hanning(n_win)).mean(axis=0),
+                                  n_win, fs, bandwidth)
+        return compute_fcp_praat_style(freqs, ltas)[4]
+
+    both = np.count_nonzero(detected & reference)
+    return {
+        "filename": os.path.basename(path),
+        "frames": len(frames),
+        "agreement": float(np.mean(detected == reference)) if len(frames) else np.nan,
+        "precision": both / max(np.count_nonzero(detected), 1),
+        "recall": both / max(np.count_nonzero(reference), 1),
+        "praat_voiced": float(np.mean(reference)) if len(frames) else np.nan,
+        "detector_voiced": float(np.mean(detected)) if len(frames) else np.nan,
+        "global_FCP_praat": global_fcp(reference),
+        "global_FCP_detector": global_fcp(detected),
+        "cpu_ms_per_sec": 1000 * cpu_secs / (len(y) / fs),
+    }
+
+def print_agreement_report(reports):
+    print(f"{'file':<28}{'frames':>8}{'agree':>8}{'prec':>8}{'recall':>8}{'praat v':>9}{'det v':>8}"
+          f"{'gFCP praat':>12}{'gFCP det':>10}{'ms/s':>7}")
+    for r in reports:
+        print(f"{r['filename'][:27]:<28}{r['frames']:>8}{r['agreement']:>8.3f}{r['precision']:>8.3f}"
+              f"{r['recall']:>8.3f}{r['praat_voiced']:>9.3f}{r['detector_voiced']:>8.3f}"
+              f"{r['global_FCP_praat']:>12.2f}{r['global_FCP_detector']:>10.2f}{r['cpu_ms_per_sec']:>7.2f}")
+
+def main():
+    import argparse
+    import glob
+    import os
+    parser = argparse.ArgumentParser(description="LIVE voicing detector vs the Parselmouth voicing mask.")
+    parser.add_argument("wavs", nargs="*", help="WAV files (default: examples/*.wav)")
+    args = parser.parse_args()
+    paths = args.wavs or sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                       "examples", "*.wav")))
+    print_agreement_report([voicing_agreement(p) for p in paths])
+
+if __name__ == "__main__":
+    main()
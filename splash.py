@@ -1,7 +1,38 @@
+import threading
+import time
 import tkinter as tk
 from PIL import Image, ImageTk
 
-def show_splash_screen(main_app_callback):
+# How often the splash checks whether the startup tasks have finished (ms)
+POLL_INTERVAL_MS = 20
+
+def run_startup_tasks(tasks):
+    """
+    Start every task (name -> callable) in its own daemon thread.
+    Returns the threads and a dict that receives each task's duration in seconds.
+    A failing task is reported and counted as finished; startup continues.
+    """
+    timings = {}
+
+    def run(name, task):
+        t0 = time.perf_counter()
+        try:
+            task()
+        except Exception as e:
+            print(f"Startup task '{name}' failed:", e)
+        timings[name] = time.perf_counter() - t0
+
+    threads = [threading.Thread(target=run, args=item, daemon=True) for item in tasks.items()]
+    for t in threads:
+        t.start()
+    return threads, timings
+
+def show_splash_screen(main_app_callback, startup_tasks=None):
+    """
+    Show the splash while startup_tasks run concurrently, then close it and call
+    main_app_callback(timings) as soon as they have all finished.
+    """
+    t0 = time.perf_counter()
     splash = tk.Tk()
     splash.overrideredirect(True)
     splash.config(bg='pink')
@@ -39,10 +70,20 @@ def show_splash_screen(main_app_callback):
     )
     lbl.pack(pady=(20, 0))
 
-    # Close the splash and call the main app after 4 seconds
-    splash.after(4000, lambda: [splash.destroy(), main_app_callback()])
-
     # Keep references
     splash.logo_tk = logo_tk
+    splash.update()  # draw the splash before the tasks compete for the interpreter
+    splash_secs = time.perf_counter() - t0
+
+    threads, timings = run_startup_tasks(startup_tasks or {})
+
+    # Close the splash and call the main app once every task has finished
+    def poll():
+        if any(t.is_alive() for t in threads):
+            splash.after(POLL_INTERVAL_MS, poll)
+            return
+        splash.destroy()
+        main_app_callback({"splash": splash_secs, **timings})
 
+    splash.after(POLL_INTERVAL_MS, poll)
     splash.mainloop()